@@ -0,0 +1,63 @@
+"""
+Latencia del event loop mientras se procesan imagenes grandes: process_image
+ejecutado en el loop (como antes del ImagePool) contra image_pool.run.
+Un probe mide cuanto tarda en volver un asyncio.sleep de 10 ms.
+
+    python -m benchmarks.image_pool
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import cv2
+import numpy as np
+from src.services.image_service import ImagePool, process_image
+
+UPLOADS = 8
+PROBE_INTERVAL = 0.01
+
+
+def sample_image() -> bytes:
+    # Foto de 4000x3000 con ruido para que el JPEG no comprima de mas
+    y, x = np.mgrid[0:3000, 0:4000]
+    image = np.dstack([x % 256, y % 256, (x + y) % 256]).astype(np.uint8)
+    image = cv2.GaussianBlur(cv2.add(image, np.random.randint(0, 40, image.shape, dtype=np.uint8)), (3, 3), 0)
+    return cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 60])[1].tobytes()
+
+async def probe(stop: asyncio.Event, delays: list[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        delays.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+async def measure(process, image: bytes, folder: str) -> tuple[float, list[float]]:
+    stop, delays = asyncio.Event(), []
+    task = asyncio.create_task(probe(stop, delays))
+    await asyncio.sleep(PROBE_INTERVAL)
+    start = time.perf_counter()
+    await asyncio.gather(*[process(image, os.path.join(folder, f'{i}.jpg'), '.jpg') for i in range(UPLOADS)])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await task
+    return elapsed, delays
+
+async def main() -> None:
+    image = sample_image()
+    pool = ImagePool(workers=2, max_pending=UPLOADS, timeout=60)
+
+    async def inline(*args):
+        return process_image(*args)
+
+    with tempfile.TemporaryDirectory() as folder:
+        for name, process in (('en el loop', inline), ('image_pool', lambda *args: pool.run(process_image, *args))):
+            elapsed, delays = await measure(process, image, folder)
+            print(
+                f'{name}: {UPLOADS} imagenes en {elapsed:.2f} s, '
+                f'demora del loop p50 {statistics.median(delays):.1f} ms, max {max(delays):.1f} ms, {len(delays)} probes'
+            )
+    pool.stop()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
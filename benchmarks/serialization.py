@@ -0,0 +1,61 @@
+"""
+Serializacion de listados: model_validate + model_dump por fila y ORJSONResponse
+(como estaban los servicios) contra list_body/page_body, que validan y
+serializan la lista en una sola pasada de pydantic.
+
+    python -m benchmarks.serialization
+"""
+import timeit
+from datetime import datetime
+from types import SimpleNamespace
+from fastapi.responses import ORJSONResponse
+from src.config.serialization import json_bytes_response, list_body, list_response, page_body
+from src.schemas.blog_schemas.blog_list_response import BlogListResponse
+from src.schemas.client.client_response import ClientResponse
+
+SIZES = (1000, 10000)
+REPEAT = 15
+
+
+def client_rows(count: int) -> list:
+    now = datetime.now()
+    return [
+        SimpleNamespace(id=str(i), first_name='Nombre', last_name='Apellido', dni=str(i), email='cliente@sijac.com', phone='3875000000', created_at=now, updated_at=now)
+        for i in range(count)
+    ]
+
+def blog_rows(count: int) -> list:
+    now = datetime.now()
+    user = SimpleNamespace(id='user', email='abogado@sijac.com', first_name='Nombre', last_name='Apellido', specialty='Civil', url_image='http://localhost/image/get_image_user/user.jpg')
+    return [
+        SimpleNamespace(id=str(i), title='Titulo del blog', excerpt='Resumen del blog ' * 10, reading_time=3, url_image=f'http://localhost/image/get_image_blog/{i}.jpg', categories='VARIOS', favorite=False, created_at=now, updated_at=now, user=user)
+        for i in range(count)
+    ]
+
+def per_row_clients(rows: list):
+    return ORJSONResponse(content=[ClientResponse.model_validate(row).model_dump(mode='json') for row in rows])
+
+def per_row_blogs(rows: list):
+    data = [BlogListResponse.model_validate(row).model_dump(mode='json') for row in rows]
+    return ORJSONResponse(content={'per_page': len(rows), 'total': len(rows), 'next_cursor': None, 'data': data})
+
+def single_pass_blogs(rows: list):
+    fields = {'per_page': len(rows), 'total': len(rows), 'next_cursor': None}
+    return json_bytes_response(page_body(fields, list_body(BlogListResponse, rows)))
+
+def measure(func, rows: list) -> float:
+    # El minimo de varias corridas es lo menos afectado por el ruido de la maquina
+    return min(timeit.repeat(lambda: func(rows), number=1, repeat=REPEAT)) * 1000
+
+
+if __name__ == '__main__':
+    cases = (
+        ('clientes', client_rows, per_row_clients, lambda rows: list_response(ClientResponse, rows)),
+        ('blogs', blog_rows, per_row_blogs, single_pass_blogs),
+    )
+    for name, build, before, after in cases:
+        for size in SIZES:
+            rows = build(size)
+            assert before(rows).body == after(rows).body
+            old, new = measure(before, rows), measure(after, rows)
+            print(f'{name} {size} filas: por fila {old:.1f} ms, una pasada {new:.1f} ms ({old / new:.1f}x)')
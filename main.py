@@ -1,4 +1,4 @@
 import uvicorn
 
 if __name__ == "__main__":
-    uvicorn.run("src:app", host="localhost", port=8000, log_level="debug", reload=True)
\ No newline at end of file
+    uvicorn.run("src.app:app", host="localhost", port=8000, log_level="debug", reload=True)
\ No newline at end of file
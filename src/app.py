@@ -0,0 +1,108 @@
+from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi.middleware import Middleware
+from fastapi.responses import ORJSONResponse
+from src.config.init_data import init_data
+from src.config.logging_config import setup_logging
+from src.config.scheduler_task import backup_database, clean_orphan_images, maintain_database, purge_stale_rows
+from src.middleware.rate_limit import RateLimitMiddleware
+from src.middleware.timing import TimingMiddleware
+from src.middleware.upload_limit import MAX_BODY_SIZE, UploadLimitMiddleware
+from fastapi.middleware.cors import CORSMiddleware
+from src.database.db import db
+from src.database.pragmas import REPLICA_ENABLED
+from src.database.replica import replicator
+import logging
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+from src.routers.user_router import user_router
+from src.routers.blog_router import blog_router
+from src.routers.email_router import email_router
+from src.routers.image_router import image_router
+from src.routers.availability_router import availability_router
+from src.routers.appointment_router import appointment_router
+from src.routers.client_router import client_router
+from src.routers.case_router import case_router
+from src.routers.audit_router import audit_router
+from src.services.image_service import image_pool, resize_cache
+
+setup_logging()
+
+app = FastAPI(title= 'API SIJAC',
+            description='API SIJAC',
+            version='0.0.1',
+            docs_url='/',
+            default_response_class=ORJSONResponse,
+            )
+
+app.state.rate_limit_ips = {}
+
+
+app.include_router(router= user_router)
+app.include_router(router= blog_router)
+app.include_router(router= email_router)
+app.include_router(router= image_router)
+app.include_router(router= availability_router)
+app.include_router(router= appointment_router)
+app.include_router(router= client_router)
+app.include_router(router= case_router)
+app.include_router(router= audit_router)
+
+origins = [
+    '*'
+]
+
+# Primero, para que su HTTPException llegue al router sin pasar por los BaseHTTPMiddleware
+app.add_middleware(UploadLimitMiddleware, max_body_size=MAX_BODY_SIZE)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=origins,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+app.add_middleware(TimingMiddleware)
+app.add_middleware(RateLimitMiddleware)
+
+scheduler = AsyncIOScheduler()
+
+# scheduler.add_job(backup_database, CronTrigger(day_of_week="thu", hour=20, minute=43))
+scheduler.add_job(backup_database, CronTrigger(day_of_week="sun", hour=1, minute=0))
+scheduler.add_job(purge_stale_rows, CronTrigger(hour=0, minute=15))
+scheduler.add_job(clean_orphan_images, CronTrigger(hour=0, minute=30))
+# Despues de las purgas, en el horario de menos uso
+scheduler.add_job(maintain_database, CronTrigger(hour=4, minute=0))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if db.is_closed():
+        try:
+            # await db.create_database_if_not_exists()   #QUITAR ESTA LINEA PARA MYSQL
+            await db.connect()
+        except Exception as e:
+            logging.error(f"Error al conectar a la base de datos: {e}")
+            raise e
+    await db.create_tables()
+    async with db.async_write_session() as session:
+        await init_data(session)
+    # Recorre la cache de redimensionadas antes de atender pedidos
+    await resize_cache.load()
+
+    if REPLICA_ENABLED:
+        replicator.start()
+
+    scheduler.start()
+    logging.info("🚀 Scheduler iniciado")
+    yield
+    # Antes de cerrar la base: al cerrar la ultima conexion SQLite hace un checkpoint
+    await replicator.stop()
+    if not db.is_closed():
+        await db.close()
+        logging.info("El servidor se está cerrando.")
+    image_pool.stop()
+
+
+app.router.lifespan_context = lifespan
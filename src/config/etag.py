@@ -0,0 +1,40 @@
+import hashlib
+from fastapi import Request, Response, status
+from fastapi.responses import ORJSONResponse
+
+
+def make_etag(*parts) -> str:
+    """
+    ETag fuerte a partir de versiones de fila (ids, updated_at, etc.).
+    """
+    digest = hashlib.blake2b('|'.join(str(part) for part in parts).encode('utf-8'), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+def body_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get('if-none-match')
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return etag in candidates
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+def json_with_etag(request: Request, content, status_code: int = status.HTTP_200_OK) -> Response:
+    """
+    Serializa la respuesta y usa el hash del cuerpo como ETag,
+    devolviendo 304 si el cliente ya tiene esa version.
+    """
+    return bytes_with_etag(request, ORJSONResponse(content=content, status_code=status_code))
+
+def bytes_with_etag(request: Request, response: Response) -> Response:
+    etag = body_etag(response.body)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers['ETag'] = etag
+    return response
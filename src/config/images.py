@@ -0,0 +1,28 @@
+import os
+from decouple import Csv, config
+
+MAX_DIMENSION = 1024
+# Anchos de las variantes que se guardan junto a la imagen original
+VARIANT_WIDTHS: tuple[int, ...] = tuple(config('IMAGE_VARIANT_WIDTHS', default='160,480', cast=Csv(int)))
+# Anchos permitidos para el redimensionado a pedido
+RESIZE_WIDTHS: tuple[int, ...] = tuple(config('IMAGE_RESIZE_WIDTHS', default='160,320,480,640,800,1024', cast=Csv(int)))
+
+
+def variant_name(filename: str, width: int) -> str:
+    name, extension = os.path.splitext(filename)
+    return f"{name}_{width}{extension}"
+
+def original_name(filename: str) -> str:
+    name, extension = os.path.splitext(filename)
+    base, _, width = name.rpartition('_')
+    if base and width.isdigit() and int(width) in VARIANT_WIDTHS:
+        return f"{base}{extension}"
+    return filename
+
+def image_srcset(url: str) -> dict[str, str]:
+    """
+    Mapa ancho -> url de cada variante, para armar el srcset en el front.
+    """
+    srcset = {str(width): variant_name(url, width) for width in VARIANT_WIDTHS}
+    srcset[str(MAX_DIMENSION)] = url
+    return srcset
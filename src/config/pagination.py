@@ -0,0 +1,37 @@
+from datetime import datetime
+from fastapi import HTTPException, status
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    return f"{created_at.isoformat()},{id}"
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    Decodifica un cursor con el formato '<created_at>,<id>'.
+    """
+    try:
+        created_at, id = cursor.split(',', 1)
+        if not id:
+            raise ValueError
+        return datetime.fromisoformat(created_at), id
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="El cursor debe tener el formato '<created_at>,<id>'"
+        )
+
+def encode_rank_cursor(rank: float, rowid: int) -> str:
+    return f"{rank!r},{rowid}"
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    """
+    Decodifica un cursor de busqueda con el formato '<rank>,<rowid>'.
+    """
+    try:
+        rank, rowid = cursor.split(',', 1)
+        return float(rank), int(rowid)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="El cursor debe tener el formato '<rank>,<rowid>'"
+        )
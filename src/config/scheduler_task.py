@@ -1,32 +1,113 @@
-import logging
-from sqlmodel import select
+import asyncio, logging, os, time
+from decouple import config
+from sqlmodel import delete, select
+from src.config.timezone import get_timezone
+from src.database.counters import counters
 from src.database.db import db
+from src.database.maintenance import run_maintenance
 from src.drive.backup.backup_db import drive_backup_db
 from src.drive.backup.backup_images import drive_backup_images
 from src.models.appointment import Appointment, StateAppointment
-from datetime import date
+from src.models.audit import Audit
+from src.models.blog_model import Blog
+from src.models.refresh_token import HistorialRefreshToken
+from src.models.user_model import User
+from src.services.image_service import ImageTool
+from datetime import date, timedelta
 
-async def backup_database():
-    try:
-        logging.info(f"Realizando backup de la base de datos")
-        async for session in db.get_session():
-            try:
-                sttmt = select(Appointment
-                            ).where(Appointment.state == StateAppointment.NULL
-                            ).where(Appointment.date_get < date.today()
-                        )
-                appointments: list[Appointment] = (await session.exec(sttmt)).all()
-                for appointment in appointments:
-                    await session.delete(appointment)
+PURGE_BATCH_SIZE = config('PURGE_BATCH_SIZE', default=1000, cast=int)
+AUDIT_RETENTION_DAYS = config('AUDIT_RETENTION_DAYS', default=365, cast=int)
 
+# El VACUUM y los checkpoints hacen reiniciar el snapshot del backup, no corren a la vez
+backup_lock = asyncio.Lock()
+
+async def purge_in_batches(model, *conditions) -> int:
+    """
+    Borra las filas que cumplen las condiciones en lotes de PURGE_BATCH_SIZE.
+    Cada lote es una transaccion con su propio turno de escritura, asi las
+    demas escrituras no esperan a que termine toda la purga.
+    """
+    batch = select(model.id).where(*conditions).limit(PURGE_BATCH_SIZE)
+    deleted = 0
+    while True:
+        async with db.writer.turn():
+            async with db.async_write_session() as session:
+                result = await session.exec(delete(model).where(model.id.in_(batch)))
                 await session.commit()
-                break
+        deleted += result.rowcount
+        if result.rowcount < PURGE_BATCH_SIZE:
+            return deleted
+
+async def purge_stale_rows():
+    try:
+        logging.info("Purgando registros antiguos")
+        now = get_timezone()
+        purges = {
+            'appointments': (Appointment, Appointment.state == StateAppointment.NULL, Appointment.date_get < date.today()),
+            'refresh_tokens': (HistorialRefreshToken, HistorialRefreshToken.expire < now),
+            'audits': (Audit, Audit.created_at < now - timedelta(days=AUDIT_RETENTION_DAYS)),
+        }
+        report = {}
+        for name, (model, *conditions) in purges.items():
+            start = time.perf_counter()
+            try:
+                deleted = await purge_in_batches(model, *conditions)
             except Exception as e:
-                logging.error(f"Error al eliminar citas antiguas: {e}")
-                break 
+                logging.error(f"Error al purgar {name}: {e}")
+                continue
+            report[name] = {"rows": deleted, "seconds": round(time.perf_counter() - start, 3)}
+            logging.info(f"Purga de {name}: {deleted} filas en {report[name]['seconds']}s")
+
+        if report.get('audits', {}).get('rows'):
+            counters.invalidate('audits')
+        return report
+    except Exception as e:
+        logging.error(f"Error al purgar registros antiguos: {e}")
+
+async def backup_database():
+    try:
+        async with backup_lock:
+            logging.info(f"Realizando backup de la base de datos")
+            await drive_backup_db()
+
+            await drive_backup_images()
+    except Exception as e:
+        logging.error(f"Error al hacer la copia de seguridad: {e}")
+
+async def maintain_database():
+    if backup_lock.locked():
+        logging.info("Hay un backup en curso, se omite el mantenimiento de la base de datos")
+        return
+    try:
+        async with backup_lock:
+            logging.info("Mantenimiento de la base de datos")
+            report = await run_maintenance()
+        logging.info(f"Mantenimiento de la base de datos terminado: {report}")
+        return report
+    except Exception as e:
+        logging.error(f"Error en el mantenimiento de la base de datos: {e}")
+
+async def clean_orphan_images():
+    try:
+        logging.info("Buscando imagenes huerfanas")
+        grace_seconds = config('IMAGE_GC_GRACE_HOURS', default=24, cast=float) * 3600
+        removed, reclaimed = 0, 0
+        # Con el turno de escritura ninguna subida puede agregar una referencia en el medio
+        async with db.writer.turn():
+            async with db.async_write_session() as session:
+                try:
+                    for folder, model in (('blog', Blog), ('user', User)):
+                        referenced = set((await session.exec(select(model.url_image).distinct())).all())
+                        files, size = await ImageTool(os.path.join('src', 'images', folder)).sweep_orphans(session, referenced, grace_seconds)
+                        removed += files
+                        reclaimed += size
 
-        await drive_backup_db()
+                    await session.commit()
+                except Exception as e:
+                    logging.error(f"Error al eliminar imagenes huerfanas: {e}")
+                    await session.rollback()
 
-        await drive_backup_images()
+        logging.info(f"Imagenes huerfanas eliminadas: {removed} archivos, {reclaimed} bytes liberados")
+        return {"files": removed, "bytes": reclaimed}
     except Exception as e:
-        logging.error(f"Error al hacer la copia de seguridad: {e}")
\ No newline at end of file
+        logging.error(f"Error al limpiar imagenes huerfanas: {e}")
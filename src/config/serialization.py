@@ -0,0 +1,31 @@
+from functools import lru_cache
+from typing import Iterable
+import orjson
+from fastapi import Response, status
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+def list_body(model: type[BaseModel], rows: Iterable) -> bytes:
+    """
+    Valida y serializa una lista de filas ORM a JSON en una sola pasada.
+    """
+    adapter = list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(list(rows), from_attributes=True))
+
+def page_body(fields: dict, data: bytes) -> bytes:
+    """
+    Objeto JSON con los campos de paginacion y la lista ya serializada en "data",
+    sin volver a convertirla a dicts para embeberla.
+    """
+    envelope = orjson.dumps(fields)
+    return envelope[:-1] + (b',"data":' if fields else b'"data":') + data + b'}'
+
+def json_bytes_response(body: bytes, status_code: int = status.HTTP_200_OK) -> Response:
+    return Response(content=body, status_code=status_code, media_type='application/json')
+
+def list_response(model: type[BaseModel], rows: Iterable, status_code: int = status.HTTP_200_OK) -> Response:
+    return json_bytes_response(list_body(model, rows), status_code)
@@ -0,0 +1,11 @@
+from decouple import config
+from fastapi import Request
+
+# URL publica de la API, ej: https://api.sijac.com. Sin configurar se arma con el Host del request
+PUBLIC_BASE_URL = config('PUBLIC_BASE_URL', default='').rstrip('/')
+
+
+def base_url(request: Request) -> str:
+    if PUBLIC_BASE_URL:
+        return PUBLIC_BASE_URL
+    return f'{request.scope.get("scheme")}://{request.headers.get("host")}'
@@ -0,0 +1,48 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from src.database.pragmas import SQLITE_PRAGMAS, register_functions
+
+
+def snapshot_database(source_path: str, target_path: str) -> None:
+    """
+    Copia consistente con la API de backup online de SQLite: incluye lo que
+    todavia esta en el WAL y no bloquea a los escritores mientras copia.
+    """
+    with closing(sqlite3.connect(source_path)) as source, closing(sqlite3.connect(target_path)) as target:
+        source.execute(f"PRAGMA busy_timeout={SQLITE_PRAGMAS['busy_timeout']}")
+        source.backup(target)
+        # La copia queda en un unico archivo, sin -wal ni -shm
+        target.execute('PRAGMA journal_mode=DELETE')
+
+def verify_snapshot(path: str) -> None:
+    """
+    Ejecuta PRAGMA integrity_check sobre el archivo de la copia, en solo lectura
+    y sin cargarla en memoria.
+    """
+    with closing(sqlite3.connect(f'file:{path}?mode=ro', uri=True)) as snapshot:
+        # Desde SQLite 3.44 integrity_check revisa el indice FTS, que en copias viejas lee decompress_text
+        register_functions(snapshot, None)
+        result = [row[0] for row in snapshot.execute('PRAGMA integrity_check')]
+    if result != ['ok']:
+        raise sqlite3.DatabaseError(f"La copia de la base de datos esta corrupta: {result[:5]}")
+
+async def create_snapshot(database_path: str) -> str:
+    """
+    Genera y verifica una copia de la base en un archivo temporal, en un hilo
+    aparte para no bloquear el event loop. Quien la usa debe eliminar el archivo.
+    """
+    name = os.path.splitext(os.path.basename(database_path))[0]
+    fd, path = tempfile.mkstemp(prefix=f'{name}-', suffix='.db')
+    os.close(fd)
+    try:
+        await asyncio.to_thread(snapshot_database, database_path, path)
+        await asyncio.to_thread(verify_snapshot, path)
+    except Exception:
+        os.remove(path)
+        raise
+    logging.info(f"Copia de la base de datos verificada: {os.path.getsize(path)} bytes")
+    return path
@@ -0,0 +1,38 @@
+from typing import Awaitable, Callable, Hashable
+
+
+class CounterCache:
+    """
+    Cache en memoria de totales por tabla/filtro.
+    El total se calcula una vez con el loader y luego se mantiene con
+    incr() desde los caminos de creacion y eliminacion.
+    """
+    def __init__(self) -> None:
+        self._values: dict[Hashable, int] = {}
+        self._versions: dict[Hashable, int] = {}
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[int]]) -> int:
+        if key in self._values:
+            return self._values[key]
+        version = self._versions.get(key, 0)
+        value = await loader()
+        # Si hubo una escritura mientras se contaba, el valor puede estar desfasado
+        if self._versions.get(key, 0) == version:
+            self._values[key] = value
+        return value
+
+    def incr(self, key: Hashable, delta: int = 1) -> None:
+        self._versions[key] = self._versions.get(key, 0) + 1
+        if key in self._values:
+            self._values[key] += delta
+
+    def invalidate(self, *keys: Hashable) -> None:
+        for key in keys:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._values.pop(key, None)
+
+    def clear(self) -> None:
+        self.invalidate(*(set(self._values) | set(self._versions)))
+
+
+counters = CounterCache()
@@ -1,20 +1,68 @@
 from sqlmodel import SQLModel
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import sessionmaker
 from decouple import config
 import logging
 import aiosqlite
+from src.database.migrations import run_migrations
+from src.database.pragmas import register_functions, set_read_only, set_sqlite_pragmas
+from src.database.writer import WriteQueue, WriteSession
 
 class DataBase:
     def __init__(self):
-        self.database_url = f"sqlite+aiosqlite:///./{config('DB_NAME')}.db"
-        self.engine = create_async_engine(self.database_url, echo=True)
+        self.database_path = f"./{config('DB_NAME')}.db"
+        self.database_url = f"sqlite+aiosqlite:///{self.database_path}"
+        echo = config('DB_ECHO', default=False, cast=bool)
+
+        # Unica conexion de escritura, SQLite admite un solo escritor a la vez
+        self.engine = create_async_engine(
+            self.database_url,
+            echo=echo,
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+        )
+        event.listen(self.engine.sync_engine, 'connect', set_sqlite_pragmas)
+        event.listen(self.engine.sync_engine, 'connect', register_functions)
+
+        # Pool de conexiones de solo lectura
+        self.read_engine = create_async_engine(
+            self.database_url,
+            echo=echo,
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=config('DB_READ_POOL_SIZE', default=5, cast=int),
+            max_overflow=config('DB_READ_MAX_OVERFLOW', default=5, cast=int),
+        )
+        event.listen(self.read_engine.sync_engine, 'connect', set_sqlite_pragmas)
+        event.listen(self.read_engine.sync_engine, 'connect', register_functions)
+        event.listen(self.read_engine.sync_engine, 'connect', set_read_only)
+
+        self.writer = WriteQueue(
+            max_pending=config('DB_WRITE_QUEUE_SIZE', default=100, cast=int),
+            timeout=config('DB_WRITE_QUEUE_TIMEOUT', default=10, cast=float),
+        )
+        self.async_session = sessionmaker(
+            bind=self.read_engine,
+            class_=AsyncSession,
+            expire_on_commit=False
+        )
+        # El turno de escritura se toma en la primera consulta y se libera en el commit
+        self.async_write_session = sessionmaker(
+            bind=self.engine,
+            class_=WriteSession,
+            expire_on_commit=False,
+            writer=self.writer,
+        )
 
     async def connect(self):
         try:
             logging.info('Conectando a la base de datos...')
-            await self.engine.connect()
+            async with self.engine.connect():
+                pass
+            self.writer.start()
             logging.info('Conexión exitosa')
         except Exception as e:
             logging.error(f'Error al conectar a la base de datos: {e}')
@@ -22,6 +70,8 @@ class DataBase:
 
     async def close(self):
         logging.info('Cerrando conexion a la base de datos...')
+        await self.writer.stop()
+        await self.read_engine.dispose()
         await self.engine.dispose()
         logging.info('Conexión cerrada')
 
@@ -40,23 +90,23 @@ class DataBase:
             from src.models.case import Case
             from src.models.user_case import UserCase
             from src.models.audit import Audit
+            from src.models.image_reference import ImageReference
 
             async with self.engine.begin() as conn:
                 await conn.run_sync(SQLModel.metadata.create_all)
-            logging.info('Tablas validadas')
+                version = await conn.run_sync(run_migrations)
+            logging.info(f'Tablas validadas, version del esquema: {version}')
         except Exception as e:
             logging.error(f'Error al validar las tablas: {e}')
             raise e
 
     async def get_session(self):
-        async_session = sessionmaker(
-            bind=self.engine,
-            class_=AsyncSession,
-            expire_on_commit=False
-        )
+        async with self.async_session() as session:
+            yield session
 
-        async with async_session() as session:
+    async def get_write_session(self):
+        async with self.async_write_session() as session:
             yield session
 
 
-db = DataBase()
\ No newline at end of file
+db = DataBase()
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from decouple import config
+from src.database.db import db
+from src.database.pragmas import REPLICA_ENABLED, set_sqlite_pragmas
+from src.database.replica import replicator
+
+# Paginas libres que se devuelven al sistema por corrida, 0 = todas
+VACUUM_MAX_PAGES = config('DB_VACUUM_MAX_PAGES', default=0, cast=int)
+ANALYSIS_LIMIT = config('DB_ANALYSIS_LIMIT', default=1000, cast=int)
+
+
+def open_connection() -> sqlite3.Connection:
+    # Mismos PRAGMAs que el pool: con la replicacion activa no hay checkpoints automaticos
+    conn = sqlite3.connect(db.database_path, isolation_level=None)
+    set_sqlite_pragmas(conn, None)
+    return conn
+
+def optimize(conn: sqlite3.Connection) -> dict:
+    """
+    Actualiza las estadisticas del planificador. La primera vez se hace un ANALYZE
+    completo, despues PRAGMA optimize solo analiza las tablas que cambiaron bastante.
+    """
+    conn.execute(f'PRAGMA analysis_limit={ANALYSIS_LIMIT}')
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is None:
+        conn.execute('ANALYZE')
+        return {'mode': 'analyze'}
+    conn.execute('PRAGMA optimize=0x10002')
+    return {'mode': 'optimize'}
+
+def incremental_vacuum(conn: sqlite3.Connection) -> dict:
+    page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+        # Las bases creadas antes de auto_vacuum=INCREMENTAL se convierten una sola vez
+        logging.info('Convirtiendo la base a auto_vacuum incremental con un VACUUM completo')
+        conn.execute('VACUUM')
+    # executescript ejecuta el PRAGMA hasta el final, execute liberaria una sola pagina
+    conn.executescript(f'PRAGMA incremental_vacuum({VACUUM_MAX_PAGES})')
+    return {
+        'pages_freed': page_count - conn.execute('PRAGMA page_count').fetchone()[0],
+        'free_pages': conn.execute('PRAGMA freelist_count').fetchone()[0],
+    }
+
+def checkpoint(conn: sqlite3.Connection) -> dict:
+    busy, wal_pages, checkpointed = conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+    return {'busy': bool(busy), 'wal_pages': wal_pages, 'checkpointed': checkpointed}
+
+def timed(step, *args) -> dict:
+    start = time.perf_counter()
+    result = step(*args)
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+def maintain(with_checkpoint: bool) -> dict:
+    report = {}
+    with closing(open_connection()) as conn:
+        report['optimize'] = timed(optimize, conn)
+        report['vacuum'] = timed(incremental_vacuum, conn)
+        if with_checkpoint:
+            report['checkpoint'] = timed(checkpoint, conn)
+    return report
+
+async def run_maintenance() -> dict:
+    """
+    ANALYZE/optimize, vacuum incremental y checkpoint del WAL con el turno de escritura.
+    Con la replicacion activa el checkpoint lo hace el Replicator, despues de copiar el WAL.
+    """
+    async with db.writer.turn():
+        report = await asyncio.to_thread(maintain, not REPLICA_ENABLED)
+    if REPLICA_ENABLED:
+        start = time.perf_counter()
+        await replicator.checkpoint()
+        report['checkpoint'] = {'replica': True, 'seconds': round(time.perf_counter() - start, 3)}
+    return report
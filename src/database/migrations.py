@@ -0,0 +1,158 @@
+import logging
+from typing import Callable
+from datetime import datetime
+from sqlalchemy import Connection
+
+def add_column(table: str, column: str, ddl: str) -> Callable[[Connection], None]:
+    # SQLite no soporta ADD COLUMN IF NOT EXISTS
+    def migrate(conn: Connection) -> None:
+        columns = [row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info({table})')]
+        if column not in columns:
+            conn.exec_driver_sql(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}')
+    return migrate
+
+def backfill_blog_excerpts(conn: Connection) -> None:
+    from src.database.types import decompress_text
+    from src.services.blog_service import BlogService
+
+    rows = conn.exec_driver_sql('SELECT id, body FROM blogs WHERE excerpt IS NULL').all()
+    if rows:
+        conn.exec_driver_sql(
+            'UPDATE blogs SET excerpt = ?, reading_time = ? WHERE id = ?',
+            [(*BlogService.summarize(decompress_text(body)), id) for id, body in rows]
+        )
+
+def compress_blog_bodies(conn: Connection) -> None:
+    from src.database.types import compress_text
+
+    rows = conn.exec_driver_sql("SELECT id, body FROM blogs WHERE typeof(body) = 'text'").all()
+    updates = [(compressed, id) for id, body in rows if isinstance(compressed := compress_text(body), bytes)]
+    if updates:
+        conn.exec_driver_sql('UPDATE blogs SET body = ? WHERE id = ?', updates)
+        logging.info(f'Cuerpos de blog comprimidos: {len(updates)}')
+
+def backfill_refresh_token_expire(conn: Connection) -> None:
+    import jwt
+    from decouple import config
+
+    rows = conn.exec_driver_sql('SELECT id, refresh_token FROM historial_refresh_token WHERE expire IS NULL').all()
+    updates = []
+    for id, refresh_token in rows:
+        try:
+            expire = jwt.decode(refresh_token, config('SECRET_KEY'), algorithms=['HS256'])['expire']
+        except Exception:
+            # Un token que no se puede decodificar ya no sirve para refrescar
+            expire = datetime.now().isoformat()
+        updates.append((datetime.fromisoformat(expire).strftime('%Y-%m-%d %H:%M:%S.%f'), id))
+    if updates:
+        conn.exec_driver_sql('UPDATE historial_refresh_token SET expire = ? WHERE id = ?', updates)
+
+def fill_blogs_fts(conn: Connection) -> None:
+    from src.database.types import decompress_text
+
+    rows = conn.exec_driver_sql('SELECT rowid, title, body FROM blogs').all()
+    if rows:
+        conn.exec_driver_sql(
+            'INSERT INTO blogs_fts(rowid, title, body) VALUES (?, ?, ?)',
+            [(rowid, title, decompress_text(body)) for rowid, title, body in rows]
+        )
+
+# Migraciones versionadas, se registran en PRAGMA user_version.
+# Cada paso debe ser idempotente (IF NOT EXISTS) para poder reintentarse.
+MIGRATIONS: list[tuple[int, str, list[str | Callable[[Connection], None]]]] = [
+    (1, 'Indices compuestos para las consultas frecuentes', [
+        'CREATE INDEX IF NOT EXISTS ix_appointments_user_id_date_get ON appointments (user_id, date_get)',
+        'CREATE INDEX IF NOT EXISTS ix_appointments_state_date_get ON appointments (state, date_get)',
+        'CREATE INDEX IF NOT EXISTS ix_user_case_user_id_case_id ON user_case (user_id, case_id)',
+        'CREATE INDEX IF NOT EXISTS ix_blogs_favorite_created_at ON blogs (favorite, created_at)',
+        'CREATE INDEX IF NOT EXISTS ix_audits_created_at ON audits (created_at)',
+        'CREATE INDEX IF NOT EXISTS ix_historial_refresh_token_token_refresh_token ON historial_refresh_token (token, refresh_token)',
+    ]),
+    (2, 'Indices para claves foraneas usadas en joins', [
+        'CREATE INDEX IF NOT EXISTS ix_appointments_availability_id ON appointments (availability_id)',
+        'CREATE INDEX IF NOT EXISTS ix_user_case_case_id ON user_case (case_id)',
+        'CREATE INDEX IF NOT EXISTS ix_cases_client_id ON cases (client_id)',
+    ]),
+    (3, 'Indices (created_at, id) para paginacion por cursor', [
+        'CREATE INDEX IF NOT EXISTS ix_blogs_favorite_created_at_id ON blogs (favorite, created_at, id)',
+        'CREATE INDEX IF NOT EXISTS ix_audits_created_at_id ON audits (created_at, id)',
+        'DROP INDEX IF EXISTS ix_blogs_favorite_created_at',
+        'DROP INDEX IF EXISTS ix_audits_created_at',
+    ]),
+    (4, 'Busqueda full-text de blogs con FTS5', [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS blogs_fts USING fts5("
+        "title, body, content='blogs', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS blogs_fts_ai AFTER INSERT ON blogs BEGIN "
+        "INSERT INTO blogs_fts(rowid, title, body) VALUES (new.rowid, new.title, new.body); END",
+        "CREATE TRIGGER IF NOT EXISTS blogs_fts_ad AFTER DELETE ON blogs BEGIN "
+        "INSERT INTO blogs_fts(blogs_fts, rowid, title, body) VALUES ('delete', old.rowid, old.title, old.body); END",
+        "CREATE TRIGGER IF NOT EXISTS blogs_fts_au AFTER UPDATE OF title, body ON blogs BEGIN "
+        "INSERT INTO blogs_fts(blogs_fts, rowid, title, body) VALUES ('delete', old.rowid, old.title, old.body); "
+        "INSERT INTO blogs_fts(rowid, title, body) VALUES (new.rowid, new.title, new.body); END",
+        "INSERT INTO blogs_fts(blogs_fts) VALUES ('rebuild')",
+    ]),
+    (5, 'Extracto y tiempo de lectura precalculados para los listados de blogs', [
+        add_column('blogs', 'excerpt', 'VARCHAR(300)'),
+        add_column('blogs', 'reading_time', 'INTEGER'),
+        backfill_blog_excerpts,
+    ]),
+    (6, 'Cuerpos de blog comprimidos, el indice FTS lee el texto descomprimido', [
+        'DROP TRIGGER IF EXISTS blogs_fts_ai',
+        'DROP TRIGGER IF EXISTS blogs_fts_ad',
+        'DROP TRIGGER IF EXISTS blogs_fts_au',
+        'DROP TABLE IF EXISTS blogs_fts',
+        "CREATE VIEW IF NOT EXISTS blogs_fts_content AS "
+        "SELECT rowid AS blog_rowid, title, decompress_text(body) AS body FROM blogs",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS blogs_fts USING fts5("
+        "title, body, content='blogs_fts_content', content_rowid='blog_rowid', tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS blogs_fts_ai AFTER INSERT ON blogs BEGIN "
+        "INSERT INTO blogs_fts(rowid, title, body) VALUES (new.rowid, new.title, decompress_text(new.body)); END",
+        "CREATE TRIGGER IF NOT EXISTS blogs_fts_ad AFTER DELETE ON blogs BEGIN "
+        "INSERT INTO blogs_fts(blogs_fts, rowid, title, body) VALUES ('delete', old.rowid, old.title, decompress_text(old.body)); END",
+        "CREATE TRIGGER IF NOT EXISTS blogs_fts_au AFTER UPDATE OF title, body ON blogs BEGIN "
+        "INSERT INTO blogs_fts(blogs_fts, rowid, title, body) VALUES ('delete', old.rowid, old.title, decompress_text(old.body)); "
+        "INSERT INTO blogs_fts(rowid, title, body) VALUES (new.rowid, new.title, decompress_text(new.body)); END",
+        "INSERT INTO blogs_fts(blogs_fts) VALUES ('rebuild')",
+        compress_blog_bodies,
+    ]),
+    (7, 'Referencias de imagenes para el almacenamiento deduplicado', [
+        "INSERT OR IGNORE INTO image_references (folder, filename, refs) "
+        "SELECT 'blog', url_image, count(*) FROM blogs GROUP BY url_image",
+        "INSERT OR IGNORE INTO image_references (folder, filename, refs) "
+        "SELECT 'user', url_image, count(*) FROM users GROUP BY url_image",
+    ]),
+    (8, 'Indices sobre url_image para el barrido de imagenes huerfanas', [
+        'CREATE INDEX IF NOT EXISTS ix_blogs_url_image ON blogs (url_image)',
+        'CREATE INDEX IF NOT EXISTS ix_users_url_image ON users (url_image)',
+    ]),
+    (9, 'Vencimiento de los refresh tokens para purgar los expirados', [
+        add_column('historial_refresh_token', 'expire', 'DATETIME'),
+        backfill_refresh_token_expire,
+        'CREATE INDEX IF NOT EXISTS ix_historial_refresh_token_expire ON historial_refresh_token (expire)',
+    ]),
+    (10, 'Indice FTS de blogs con su propio texto plano, mantenido por BlogService sin decompress_text', [
+        'DROP TRIGGER IF EXISTS blogs_fts_ai',
+        'DROP TRIGGER IF EXISTS blogs_fts_ad',
+        'DROP TRIGGER IF EXISTS blogs_fts_au',
+        'DROP TABLE IF EXISTS blogs_fts',
+        'DROP VIEW IF EXISTS blogs_fts_content',
+        "CREATE VIRTUAL TABLE IF NOT EXISTS blogs_fts USING fts5("
+        "title, body, tokenize='unicode61 remove_diacritics 2')",
+        fill_blogs_fts,
+    ]),
+]
+
+def run_migrations(conn: Connection) -> int:
+    current = conn.exec_driver_sql('PRAGMA user_version').scalar()
+    for version, description, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        logging.info(f'Aplicando migracion {version}: {description}')
+        for statement in statements:
+            if callable(statement):
+                statement(conn)
+            else:
+                conn.exec_driver_sql(statement)
+        conn.exec_driver_sql(f'PRAGMA user_version = {version}')
+        current = version
+    return current
@@ -0,0 +1,37 @@
+from decouple import config
+from src.database.types import decompress_text
+
+# Perfil de produccion para SQLite, se aplica en cada conexion del pool
+SQLITE_PRAGMAS = {
+    # Va primero: despues de journal_mode=WAL una base nueva ya no acepta el cambio.
+    # En una base existente queda pendiente hasta el VACUUM del mantenimiento
+    'auto_vacuum': 'INCREMENTAL',
+    'journal_mode': 'WAL',
+    'synchronous': config('DB_SYNCHRONOUS', default='NORMAL'),
+    'busy_timeout': config('DB_BUSY_TIMEOUT', default=5000, cast=int),  # ms
+    'cache_size': config('DB_CACHE_SIZE', default=-20000, cast=int),  # negativo = KiB
+    'mmap_size': config('DB_MMAP_SIZE', default=268435456, cast=int),  # 256 MB
+    'temp_store': 'MEMORY',
+}
+
+# Con la replicacion activa los checkpoints los hace el Replicator, despues de copiar el WAL
+REPLICA_ENABLED = config('REPLICA_ENABLED', default=False, cast=bool)
+if REPLICA_ENABLED:
+    SQLITE_PRAGMAS['wal_autocheckpoint'] = 0
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f'PRAGMA {pragma}={value}')
+    cursor.close()
+
+# decompress_text permite leer en SQL los cuerpos comprimidos de los blogs. Hasta la
+# migracion 10 el indice FTS dependia de ella (vista blogs_fts_content y triggers): las
+# conexiones que verifican o restauran copias de esa epoca tambien la registran
+def register_functions(dbapi_connection, connection_record):
+    dbapi_connection.create_function('decompress_text', 1, decompress_text, deterministic=True)
+
+def set_read_only(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA query_only=ON')
+    cursor.close()
@@ -0,0 +1,147 @@
+import asyncio
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import closing
+from decouple import config
+from src.database.backup import snapshot_database
+from src.database.db import db
+from src.database.restore import REPLICA_DIR, WAL_HEADER_SIZE, list_generations, read_wal
+
+
+class Replicator:
+    """
+    Replicacion continua de la base (al estilo litestream) en un directorio local.
+    Cada generacion tiene un snapshot tomado con la API de backup (conserva el numero
+    de cada pagina) y los segmentos de WAL copiados despues, cada `interval` segundos.
+    Mientras esta activa, los checkpoints los hace el Replicator cuando el WAL supera
+    `checkpoint_bytes`, despues de copiar lo que falte.
+    """
+    def __init__(self, directory: str, interval: float, snapshot_interval: float, retention: float, checkpoint_bytes: int) -> None:
+        self.directory = directory
+        self.interval = interval
+        self.snapshot_interval = snapshot_interval
+        self.retention = retention
+        self.checkpoint_bytes = checkpoint_bytes
+        self._task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self._generation: str | None = None
+        self._snapshot_at = 0.0
+        self._index = 0
+        self._salt: bytes | None = None
+        self._offset = WAL_HEADER_SIZE
+        self._checksum: tuple[int, int] | None = None
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._task = asyncio.create_task(self._run())
+        logging.info('Replicacion de la base de datos iniciada')
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.sync()
+        logging.info('Replicacion de la base de datos detenida')
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if time.time() - self._snapshot_at >= self.snapshot_interval:
+                    await self.snapshot()
+                else:
+                    await self.sync()
+            except Exception as e:
+                logging.error(f'Error en la replicacion de la base de datos: {e}')
+            await asyncio.sleep(self.interval)
+
+    async def sync(self) -> None:
+        async with self._lock:
+            # Los frames confirmados no cambian hasta que se reinicia el WAL: se copian sin el turno
+            await asyncio.to_thread(self._ship)
+            if self._offset >= self.checkpoint_bytes:
+                await self._checkpoint()
+
+    async def checkpoint(self) -> None:
+        async with self._lock:
+            await self._checkpoint()
+
+    async def snapshot(self) -> None:
+        # El snapshot no necesita el turno: los segmentos siguientes arrancan en el offset
+        # ya copiado y repetir frames incluidos en el snapshot deja las mismas paginas
+        async with self._lock:
+            await asyncio.to_thread(self._ship)
+            await asyncio.to_thread(self._new_generation)
+        await asyncio.to_thread(self._apply_retention)
+
+    async def _checkpoint(self) -> None:
+        # Despues de un checkpoint completo el proximo escritor reinicia el WAL: con el turno
+        # no se confirma nada entre la ultima copia y el checkpoint
+        async with db.writer.turn():
+            await asyncio.to_thread(self._ship)
+            await asyncio.to_thread(self._checkpoint_wal)
+
+    def _ship(self) -> None:
+        wal = read_wal(f'{db.database_path}-wal', self._salt, self._offset, self._checksum)
+        if wal is None:
+            return
+        header, frames, self._offset, self._checksum = wal
+        self._salt = header[16:24]
+        if not frames or self._generation is None:
+            return
+        self._index += 1
+        name = f'{self._index:08d}-{int(time.time() * 1000):013d}.wal.gz'
+        path = os.path.join(self.directory, self._generation, name)
+        with gzip.open(f'{path}.tmp', 'wb') as segment:
+            segment.write(header + frames)
+        os.replace(f'{path}.tmp', path)
+
+    def _checkpoint_wal(self) -> None:
+        # PASSIVE no espera a las lecturas en curso, lo que quede se copia en el proximo
+        with closing(sqlite3.connect(db.database_path)) as conn:
+            _, wal_pages, checkpointed = conn.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchone()
+        if checkpointed < wal_pages:
+            logging.debug('Checkpoint parcial, hay lecturas en curso')
+
+    def _new_generation(self) -> None:
+        temp_path = os.path.join(self.directory, 'snapshot.db.tmp')
+        snapshot_database(db.database_path, temp_path)
+        # La generacion lleva la hora en que termino el snapshot, que no incluye nada posterior
+        now = time.time()
+        generation = f'{int(now * 1000):013d}'
+        generation_path = os.path.join(self.directory, generation)
+        os.makedirs(generation_path, exist_ok=True)
+        snapshot_path = os.path.join(generation_path, 'snapshot.db.gz')
+        with open(temp_path, 'rb') as source, gzip.open(f'{snapshot_path}.tmp', 'wb') as target:
+            shutil.copyfileobj(source, target)
+        os.replace(f'{snapshot_path}.tmp', snapshot_path)
+        os.remove(temp_path)
+        self._generation, self._snapshot_at, self._index = generation, now, 0
+        logging.info(f'Nueva generacion de la replica: {generation}')
+
+    def _apply_retention(self) -> None:
+        # Se conserva la generacion que cubre el inicio de la ventana de retencion
+        cutoff_ms = (time.time() - self.retention) * 1000
+        generations = list_generations(self.directory)
+        for generation, following in zip(generations, generations[1:]):
+            if int(following) <= cutoff_ms:
+                shutil.rmtree(os.path.join(self.directory, generation), ignore_errors=True)
+
+
+replicator = Replicator(
+    directory=REPLICA_DIR,
+    interval=config('REPLICA_INTERVAL', default=10, cast=float),
+    snapshot_interval=config('REPLICA_SNAPSHOT_HOURS', default=24, cast=float) * 3600,
+    retention=config('REPLICA_RETENTION_DAYS', default=7, cast=float) * 86400,
+    checkpoint_bytes=config('REPLICA_CHECKPOINT_BYTES', default=4194304, cast=int),
+)
@@ -0,0 +1,127 @@
+import argparse
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import struct
+import time
+from contextlib import closing
+from datetime import datetime
+from decouple import config
+from src.database.backup import verify_snapshot
+from src.database.pragmas import register_functions
+
+REPLICA_DIR = config('REPLICA_DIR', default='replica')
+
+WAL_HEADER_SIZE = 32
+WAL_FRAME_HEADER_SIZE = 24
+# Magic number del WAL con checksums big-endian, el otro valor (0x377f0682) es little-endian
+WAL_MAGIC_BIG_ENDIAN = 0x377f0683
+
+
+def wal_checksum(data: bytes, checksum: tuple[int, int], big_endian: bool) -> tuple[int, int]:
+    s0, s1 = checksum
+    for x0, x1 in struct.iter_unpack('>II' if big_endian else '<II', data):
+        s0 = (s0 + x0 + s1) & 0xFFFFFFFF
+        s1 = (s1 + x1 + s0) & 0xFFFFFFFF
+    return s0, s1
+
+def read_wal(wal_path: str, salt: bytes | None, offset: int, checksum: tuple[int, int] | None) -> tuple[bytes, bytes, int, tuple[int, int]] | None:
+    """
+    Lee los frames del WAL desde offset hasta el ultimo frame de commit valido.
+    Se lee sin el turno de escritura: un frame a medio escribir no pasa el checksum.
+    Si las sales del encabezado cambiaron el WAL se reinicio y se lee desde el principio.
+    Devuelve (encabezado, frames, nuevo offset, checksum) o None si el WAL esta vacio.
+    """
+    try:
+        with open(wal_path, 'rb') as wal:
+            header = wal.read(WAL_HEADER_SIZE)
+            if len(header) < WAL_HEADER_SIZE:
+                return None
+            big_endian = struct.unpack('>I', header[:4])[0] == WAL_MAGIC_BIG_ENDIAN
+            if wal_checksum(header[:24], (0, 0), big_endian) != struct.unpack('>II', header[24:32]):
+                return None
+            if header[16:24] != salt:
+                offset, checksum = WAL_HEADER_SIZE, struct.unpack('>II', header[24:32])
+            wal.seek(offset)
+            data = wal.read()
+    except FileNotFoundError:
+        return None
+
+    frame_size = WAL_FRAME_HEADER_SIZE + struct.unpack('>I', header[8:12])[0]
+    position, end, end_checksum = 0, 0, checksum
+    while position + frame_size <= len(data):
+        frame_header = data[position:position + WAL_FRAME_HEADER_SIZE]
+        if frame_header[8:16] != header[16:24]:
+            break
+        page = data[position + WAL_FRAME_HEADER_SIZE:position + frame_size]
+        checksum = wal_checksum(frame_header[:8] + page, checksum, big_endian)
+        if checksum != struct.unpack('>II', frame_header[16:24]):
+            break
+        position += frame_size
+        if struct.unpack('>I', frame_header[4:8])[0] != 0:
+            end, end_checksum = position, checksum
+    return header, data[:end], offset + end, end_checksum
+
+def apply_segment(db_path: str, segment: bytes) -> None:
+    """
+    Escribe las paginas de los frames en el archivo de la base, como lo haria un checkpoint.
+    """
+    page_size = struct.unpack('>I', segment[8:12])[0]
+    frame_size = WAL_FRAME_HEADER_SIZE + page_size
+    with open(db_path, 'r+b') as database:
+        for offset in range(WAL_HEADER_SIZE, len(segment), frame_size):
+            page_number, commit_size = struct.unpack('>II', segment[offset:offset + 8])
+            database.seek((page_number - 1) * page_size)
+            database.write(segment[offset + WAL_FRAME_HEADER_SIZE:offset + frame_size])
+            if commit_size:
+                database.truncate(commit_size * page_size)
+
+def list_generations(directory: str) -> list[str]:
+    # Cada generacion es un directorio con la hora del snapshot en milisegundos
+    return sorted(name for name in os.listdir(directory) if name.isdigit())
+
+def restore(directory: str, output: str, timestamp: datetime | None = None) -> str:
+    """
+    Reconstruye la base tal como estaba en `timestamp` (o lo ultimo replicado):
+    el snapshot mas reciente anterior y luego sus segmentos de WAL en orden.
+    """
+    target_ms = int((timestamp.timestamp() if timestamp else time.time()) * 1000)
+    generations = [
+        generation for generation in list_generations(directory)
+        if int(generation) <= target_ms and os.path.exists(os.path.join(directory, generation, 'snapshot.db.gz'))
+    ]
+    if not generations:
+        raise ValueError('No hay un snapshot anterior a la fecha pedida')
+
+    generation_path = os.path.join(directory, generations[-1])
+    temp_path = f'{output}.tmp'
+    with gzip.open(os.path.join(generation_path, 'snapshot.db.gz'), 'rb') as source, open(temp_path, 'wb') as target:
+        shutil.copyfileobj(source, target)
+
+    applied = 0
+    for name in sorted(name for name in os.listdir(generation_path) if name.endswith('.wal.gz')):
+        if int(name.split('-')[1].split('.')[0]) > target_ms:
+            break
+        with gzip.open(os.path.join(generation_path, name), 'rb') as segment:
+            apply_segment(temp_path, segment.read())
+        applied += 1
+
+    with closing(sqlite3.connect(temp_path)) as conn:
+        register_functions(conn, None)
+        conn.execute('PRAGMA journal_mode=DELETE')
+    verify_snapshot(temp_path)
+    os.replace(temp_path, output)
+    logging.info(f'Base restaurada en {output}: generacion {generations[-1]}, {applied} segmentos')
+    return output
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Restaura la base de datos desde la replica')
+    parser.add_argument('output', help='archivo de la base restaurada')
+    parser.add_argument('--timestamp', type=datetime.fromisoformat, default=None, help='fecha ISO 8601, por defecto lo ultimo replicado')
+    parser.add_argument('--dir', default=REPLICA_DIR, help='directorio de la replica')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    restore(args.dir, args.output, args.timestamp)
@@ -0,0 +1,34 @@
+import zlib
+from decouple import config
+from sqlalchemy import Text
+from sqlalchemy.types import TypeDecorator
+
+COMPRESS_THRESHOLD = config('DB_COMPRESS_THRESHOLD', default=1024, cast=int)  # bytes
+
+def compress_text(value: str, threshold: int = COMPRESS_THRESHOLD) -> str | bytes:
+    encoded = value.encode('utf-8')
+    if len(encoded) < threshold:
+        return value
+    return zlib.compress(encoded)
+
+def decompress_text(value: str | bytes | None) -> str | None:
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode('utf-8')
+    return value
+
+class CompressedText(TypeDecorator):
+    """
+    Texto que se guarda como BLOB zlib cuando supera COMPRESS_THRESHOLD.
+    Los valores cortos quedan como TEXT; la lectura es transparente.
+    En SQL se puede leer con la funcion decompress_text(columna).
+    """
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from fastapi import HTTPException, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+class WriteQueue:
+    """
+    Serializa las transacciones de escritura de SQLite.
+    Una unica tarea entrega el turno de escritura a una solicitud por vez,
+    en orden de llegada y con una cola acotada.
+    """
+    def __init__(self, max_pending: int, timeout: float) -> None:
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        # Tarea que tiene el turno, para que los turnos anidados no se encolen detras de si mismos
+        self._owner: ContextVar[asyncio.Task | None] = ContextVar('write_turn_owner', default=None)
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._task = asyncio.create_task(self._run())
+        logging.info('Cola de escritura iniciada')
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._queue = None
+        logging.info('Cola de escritura detenida')
+
+    async def _run(self) -> None:
+        while True:
+            granted, released = await self._queue.get()
+            if granted.done():
+                # La solicitud se cancelo o vencio mientras esperaba
+                continue
+            granted.set_result(None)
+            await released.wait()
+
+    @asynccontextmanager
+    async def turn(self):
+        if self._owner.get() is asyncio.current_task():
+            yield
+            return
+        self.start()
+        granted = asyncio.get_running_loop().create_future()
+        released = asyncio.Event()
+        try:
+            self._queue.put_nowait((granted, released))
+        except asyncio.QueueFull:
+            logging.warning('Cola de escritura llena')
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="El servidor está ocupado, intente nuevamente"
+            )
+        try:
+            try:
+                await asyncio.wait_for(granted, self.timeout)
+            except asyncio.TimeoutError:
+                logging.warning('Tiempo de espera agotado en la cola de escritura')
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="El servidor está ocupado, intente nuevamente"
+                )
+            self._owner.set(asyncio.current_task())
+            yield
+        finally:
+            if self._owner.get() is asyncio.current_task():
+                self._owner.set(None)
+            released.set()
+
+    def pending(self) -> int:
+        return 0 if self._queue is None else self._queue.qsize()
+
+
+class WriteSession(AsyncSession):
+    """
+    Sesion de escritura que pide el turno a la WriteQueue recien en la primera
+    operacion contra la base y lo devuelve al terminar la transaccion (commit,
+    rollback o close). Procesar imagenes, enviar mails o verificar contraseñas
+    antes de la primera consulta o despues del commit no retiene el turno.
+    """
+    def __init__(self, *args, writer: WriteQueue, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.writer = writer
+        self._turn = None
+
+    async def acquire(self) -> None:
+        if self._turn is None:
+            turn = self.writer.turn()
+            await turn.__aenter__()
+            self._turn = turn
+
+    async def release(self) -> None:
+        turn, self._turn = self._turn, None
+        if turn is not None:
+            await turn.__aexit__(None, None, None)
+
+    async def exec(self, *args, **kwargs):
+        await self.acquire()
+        return await super().exec(*args, **kwargs)
+
+    async def execute(self, *args, **kwargs):
+        await self.acquire()
+        return await super().execute(*args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        await self.acquire()
+        return await super().scalar(*args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        await self.acquire()
+        return await super().scalars(*args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        await self.acquire()
+        return await super().get(*args, **kwargs)
+
+    async def delete(self, *args, **kwargs):
+        await self.acquire()
+        return await super().delete(*args, **kwargs)
+
+    async def merge(self, *args, **kwargs):
+        await self.acquire()
+        return await super().merge(*args, **kwargs)
+
+    async def refresh(self, *args, **kwargs):
+        await self.acquire()
+        return await super().refresh(*args, **kwargs)
+
+    async def flush(self, *args, **kwargs):
+        await self.acquire()
+        return await super().flush(*args, **kwargs)
+
+    async def commit(self) -> None:
+        if self.in_transaction() or self.new or self.dirty or self.deleted:
+            await self.acquire()
+        try:
+            await super().commit()
+        finally:
+            await self.release()
+
+    async def rollback(self) -> None:
+        try:
+            await super().rollback()
+        finally:
+            await self.release()
+
+    async def close(self) -> None:
+        try:
+            await super().close()
+        finally:
+            await self.release()
@@ -1,27 +1,24 @@
-import logging
-from decouple import config
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
-from google.oauth2 import service_account
+import asyncio, logging, os
 from datetime import date
+from src.database.backup import create_snapshot
+from src.database.db import db
+from src.drive.storage import compress_file, get_storage
 
 
 async def drive_backup_db():
+  snapshot_path = compressed_path = None
   try:
-    SERVICE_ACCOUNT_FILE = r'./credentials.json'
+    # Nunca se sube el archivo vivo: puede quedar una copia a medio escribir y sin el WAL
+    snapshot_path = await create_snapshot(db.database_path)
+    compressed_path = await asyncio.to_thread(compress_file, snapshot_path)
 
-    SCOPES = ['https://www.googleapis.com/auth/drive.file']
+    storage = await asyncio.to_thread(get_storage, 'db')
+    file_id = await asyncio.to_thread(storage.upload, compressed_path, f'sijac-{date.today().isoformat()}.db.gz', 'application/gzip')
 
-    credentials = service_account.Credentials.from_service_account_file(
-        SERVICE_ACCOUNT_FILE, scopes=SCOPES)
-
-    drive_service = build('drive', 'v3', credentials=credentials)
-
-    file_metadata = {'name': f'sijac-{date.today().isoformat()}.db', 'parents': [config('ID_FOLDER')]}
-    media = MediaFileUpload(r'./sijac.db', mimetype='application/octet-stream')
-
-    file = drive_service.files().create(body=file_metadata, media_body=media, fields='id').execute()
-
-    logging.info(f"Backup realizado con éxito. ID: {file.get('id')}")
+    logging.info(f"Backup realizado con éxito. ID: {file_id}")
   except Exception as e:
     logging.error(f"Error al realizar el backup: {e}")
+  finally:
+    for path in (snapshot_path, compressed_path):
+      if path is not None and os.path.exists(path):
+        os.remove(path)
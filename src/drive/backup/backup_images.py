@@ -1,67 +1,113 @@
-import logging, os
+import asyncio, json, logging, os, threading, time
+from concurrent.futures import ThreadPoolExecutor
 from decouple import config
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
-from google.oauth2 import service_account
-from datetime import date
-from sqlmodel import select
-from src.database.db import db
-from src.models.appointment import Appointment, StateAppointment
-from src.models.blog_model import Blog
+from src.drive.storage import file_digests, get_storage
+from src.config.images import original_name
 
-async def drive_backup_images():
-    try:
-        SERVICE_ACCOUNT_FILE = r'./credentials.json'
-        SCOPES = ['https://www.googleapis.com/auth/drive', 'https://www.googleapis.com/auth/drive.file']
+IMAGE_FOLDERS = [os.path.join('src', 'images', 'blog'), os.path.join('src', 'images', 'user')]
+IMAGE_MIME_TYPES = {'.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png'}
+MANIFEST_PATH = config('BACKUP_IMAGES_MANIFEST', default=os.path.join('src', 'images', 'backup_manifest.json'))
+UPLOAD_WORKERS = config('BACKUP_UPLOAD_WORKERS', default=4, cast=int)
+RECONCILE_DAYS = config('BACKUP_IMAGES_RECONCILE_DAYS', default=30, cast=int)
+
+# El cliente de Drive no es seguro entre hilos: cada hilo del pool usa el suyo
+_thread_storage = threading.local()
 
-        credentials = service_account.Credentials.from_service_account_file(
-            SERVICE_ACCOUNT_FILE, scopes=SCOPES)
 
-        drive_service = build('drive', 'v3', credentials=credentials)
+def thread_storage():
+    if not hasattr(_thread_storage, 'backend'):
+        _thread_storage.backend = get_storage('images')
+    return _thread_storage.backend
 
-        folder_id = config('ID_FOLDER_IMAGES')
+def load_manifest() -> dict:
+    try:
+        with open(MANIFEST_PATH) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {'reconciled_at': None, 'files': {}}
 
-        query = f"'{folder_id}' in parents and (mimeType='image/jpeg' or mimeType='image/png')"
-        results = drive_service.files().list(q=query, fields="files(id, name)").execute()
-        files = results.get('files', [])
+def save_manifest(manifest: dict) -> None:
+    temp_path = f"{MANIFEST_PATH}.tmp"
+    with open(temp_path, 'w') as file:
+        json.dump(manifest, file)
+    os.replace(temp_path, MANIFEST_PATH)
 
-        folder_path = os.path.join('src','images','blog') 
+def local_images() -> dict[str, str]:
+    """
+    Imagenes originales por nombre. Los nombres son hashes del contenido,
+    asi que una misma imagen en blog y user se respalda una sola vez.
+    """
+    images = {}
+    for folder_path in IMAGE_FOLDERS:
         os.makedirs(folder_path, exist_ok=True)
-        image_extensions = ['.jpg', '.jpeg', '.png']
+        for name in os.listdir(folder_path):
+            if os.path.splitext(name)[1].lower() in IMAGE_MIME_TYPES and original_name(name) == name:
+                images.setdefault(name, os.path.join(folder_path, name))
+    return images
 
-        list_images = []
+def reconcile(manifest: dict, images: dict[str, str]) -> None:
+    """
+    Recorre todo el destino (paginado) y marca como subidas las imagenes que ya estan.
+    """
+    remote_names = thread_storage().list_names()
+    files = manifest['files']
+    for name in remote_names & images.keys():
+        if name not in files:
+            stat = os.stat(images[name])
+            files[name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': None, 'remote_id': None}
+    for name in files.keys() - remote_names:
+        files.pop(name)
+    manifest['reconciled_at'] = time.time()
+    logging.info(f"Manifiesto de imagenes reconciliado: {len(files)} imagenes en el backup")
 
-        try:
-            images = [file for file in os.listdir(folder_path) 
-                    if os.path.splitext(file)[1].lower() in image_extensions]
-            
-            if images:
-                print("Imágenes encontradas:")
-                for image in images:
-                    list_images.append(image)
-            else:
-                print("No se encontraron imágenes en la carpeta especificada.")
-        except Exception as e:
-            logging.error(f"Error al listar las imágenes: {e}")
+def pending_images(manifest: dict, images: dict[str, str]) -> list[tuple[str, str, os.stat_result, str | None]]:
+    pending = []
+    for name, path in images.items():
+        stat = os.stat(path)
+        entry = manifest['files'].get(name)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            continue
+        sha256 = file_digests(path)['sha256']
+        if entry and entry['sha256'] == sha256:
+            entry['mtime_ns'] = stat.st_mtime_ns
+            continue
+        pending.append((name, path, stat, sha256))
+    return pending
 
-        list_name_images_drive = [file['name'] for file in files]
+def upload_image(name: str, path: str) -> str:
+    mime_type = IMAGE_MIME_TYPES[os.path.splitext(name)[1].lower()]
+    return thread_storage().upload(path, name, mime_type)
 
-        for elem in list_images:
-            if elem not in list_name_images_drive:
-                file_extension = elem.split('.')[-1].lower()
-                mime_type = ''
-                
-                if file_extension == 'png':
-                    mime_type = 'image/png'
-                elif file_extension == 'jpg' or file_extension == 'jpeg':
-                    mime_type = 'image/jpeg'
-                else:
-                    raise ValueError("Formato de imagen no soportado.")
+def backup_images(force_reconcile: bool = False) -> tuple[int, int]:
+    manifest = load_manifest()
+    images = local_images()
 
-                file_metadata = {'name': elem, 'parents': [config('ID_FOLDER_IMAGES')]}
-                media = MediaFileUpload(os.path.join(folder_path, elem), mimetype=mime_type)
+    reconciled_at = manifest.get('reconciled_at')
+    if force_reconcile or reconciled_at is None or time.time() - reconciled_at > RECONCILE_DAYS * 86400:
+        reconcile(manifest, images)
 
-                file = drive_service.files().create(body=file_metadata, media_body=media, fields='id').execute()
-                logging.info(f"Imagen cargada con éxito. ID: {file.get('id')}")
+    pending = pending_images(manifest, images)
+    uploaded, failed = 0, 0
+    try:
+        with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix='backup') as executor:
+            futures = {executor.submit(upload_image, name, path): (name, stat, sha256) for name, path, stat, sha256 in pending}
+            for future, (name, stat, sha256) in futures.items():
+                try:
+                    remote_id = future.result()
+                except Exception as e:
+                    failed += 1
+                    logging.error(f"Error al subir la imagen {name}: {e}")
+                    continue
+                manifest['files'][name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256, 'remote_id': remote_id}
+                uploaded += 1
+    finally:
+        # Se guarda aunque falle a mitad: lo subido no se vuelve a subir
+        save_manifest(manifest)
+    return uploaded, failed
+
+async def drive_backup_images(force_reconcile: bool = False):
+    try:
+        uploaded, failed = await asyncio.to_thread(backup_images, force_reconcile)
+        logging.info(f"Backup de imagenes: {uploaded} subidas, {failed} con error")
     except Exception as e:
         logging.error(f"Error al realizar el backup de las imagenes: {e}")
@@ -0,0 +1,245 @@
+import gzip
+import hashlib
+import logging
+import os
+import random
+import shutil
+import time
+from abc import ABC, abstractmethod
+from decouple import config
+from google.oauth2 import service_account
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
+
+# Tamaño de cada bloque de subida, Drive exige multiplos de 256 KB
+CHUNK_SIZE = config('BACKUP_CHUNK_SIZE', default=8 * 1024 * 1024, cast=int)
+RETRY_ATTEMPTS = config('BACKUP_RETRY_ATTEMPTS', default=5, cast=int)
+RETRY_BASE_DELAY = config('BACKUP_RETRY_BASE_DELAY', default=1.0, cast=float)
+
+
+def file_digests(path: str) -> dict[str, str]:
+    md5, sha256 = hashlib.md5(), hashlib.sha256()
+    with open(path, 'rb') as file:
+        while chunk := file.read(CHUNK_SIZE):
+            md5.update(chunk)
+            sha256.update(chunk)
+    return {'md5': md5.hexdigest(), 'sha256': sha256.hexdigest()}
+
+def compress_file(path: str) -> str:
+    """
+    Comprime el archivo con gzip por bloques, sin cargarlo entero en memoria.
+    Devuelve la ruta del .gz generado junto al original.
+    """
+    compressed_path = f"{path}.gz"
+    with open(path, 'rb') as source, gzip.open(compressed_path, 'wb', compresslevel=6) as target:
+        shutil.copyfileobj(source, target, CHUNK_SIZE)
+    logging.info(f"Archivo comprimido: {os.path.getsize(path)} -> {os.path.getsize(compressed_path)} bytes")
+    return compressed_path
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, HttpError):
+        return error.resp.status in (408, 429, 500, 502, 503, 504)
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+def with_retries(func, *args, **kwargs):
+    """
+    Ejecuta func reintentando los errores transitorios con backoff exponencial.
+    """
+    for attempt in range(1, RETRY_ATTEMPTS + 1):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if attempt == RETRY_ATTEMPTS or not is_retryable(e):
+                raise
+            delay = RETRY_BASE_DELAY * 2 ** (attempt - 1) + random.uniform(0, RETRY_BASE_DELAY)
+            logging.warning(f"Error transitorio en el backup, reintento {attempt}/{RETRY_ATTEMPTS - 1} en {delay:.1f}s: {e}")
+            time.sleep(delay)
+
+
+class StorageBackend(ABC):
+    """
+    Destino de los backups. Los metodos son bloqueantes: se llaman con asyncio.to_thread.
+    """
+    @abstractmethod
+    def list_names(self) -> set[str]:
+        ...
+
+    @abstractmethod
+    def upload(self, path: str, name: str, mime_type: str) -> str:
+        """
+        Sube el archivo y verifica su checksum. Devuelve el id o la ruta en el destino.
+        """
+
+    @abstractmethod
+    def download(self, name: str, path: str) -> None:
+        """
+        Descarga `name` en `path` y verifica su checksum, para restaurar un backup.
+        """
+
+
+class DriveStorage(StorageBackend):
+    SERVICE_ACCOUNT_FILE = r'./credentials.json'
+    SCOPES = ['https://www.googleapis.com/auth/drive', 'https://www.googleapis.com/auth/drive.file']
+
+    def __init__(self, folder_id: str) -> None:
+        credentials = service_account.Credentials.from_service_account_file(
+            self.SERVICE_ACCOUNT_FILE, scopes=self.SCOPES)
+        self.service = build('drive', 'v3', credentials=credentials)
+        self.folder_id = folder_id
+
+    def list_names(self) -> set[str]:
+        names, page_token = set(), None
+        while True:
+            results = with_retries(self.service.files().list(
+                q=f"'{self.folder_id}' in parents and trashed = false",
+                fields="nextPageToken, files(name)",
+                pageSize=1000,
+                pageToken=page_token,
+            ).execute)
+            names.update(file['name'] for file in results.get('files', []))
+            page_token = results.get('nextPageToken')
+            if page_token is None:
+                return names
+
+    def upload(self, path: str, name: str, mime_type: str) -> str:
+        digests = file_digests(path)
+        media = MediaFileUpload(path, mimetype=mime_type, chunksize=CHUNK_SIZE, resumable=True)
+        request = self.service.files().create(
+            body={'name': name, 'parents': [self.folder_id], 'appProperties': {'sha256': digests['sha256']}},
+            media_body=media,
+            fields='id, md5Checksum',
+        )
+        # Subida reanudable: ante un error se reintenta solo el bloque pendiente
+        response = None
+        while response is None:
+            _, response = with_retries(request.next_chunk)
+
+        if response.get('md5Checksum') != digests['md5']:
+            raise ValueError(f"El checksum de {name} en Drive no coincide con el archivo local")
+        return response['id']
+
+    def download(self, name: str, path: str) -> None:
+        escaped_name = name.replace("'", "\\'")
+        results = with_retries(self.service.files().list(
+            q=f"'{self.folder_id}' in parents and name = '{escaped_name}' and trashed = false",
+            fields="files(id, md5Checksum)",
+            orderBy="createdTime desc",
+            pageSize=1,
+        ).execute)
+        files = results.get('files', [])
+        if not files:
+            raise FileNotFoundError(f"{name} no existe en Drive")
+
+        temp_path = f"{path}.part"
+        with open(temp_path, 'wb') as file:
+            downloader = MediaIoBaseDownload(file, self.service.files().get_media(fileId=files[0]['id']), chunksize=CHUNK_SIZE)
+            done = False
+            while not done:
+                _, done = with_retries(downloader.next_chunk)
+
+        if file_digests(temp_path)['md5'] != files[0].get('md5Checksum'):
+            os.remove(temp_path)
+            raise ValueError(f"El checksum de {name} descargado no coincide con el de Drive")
+        os.replace(temp_path, path)
+
+
+class LocalStorage(StorageBackend):
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def list_names(self) -> set[str]:
+        return {name for name in os.listdir(self.directory) if not name.endswith(('.part', '.sha256'))}
+
+    def upload(self, path: str, name: str, mime_type: str) -> str:
+        target_path = os.path.join(self.directory, name)
+        temp_path = f"{target_path}.part"
+        sha256 = file_digests(path)['sha256']
+        shutil.copyfile(path, temp_path)
+        if file_digests(temp_path)['sha256'] != sha256:
+            os.remove(temp_path)
+            raise ValueError(f"El checksum de la copia de {name} no coincide con el archivo original")
+        os.replace(temp_path, target_path)
+        with open(f"{target_path}.sha256", 'w') as file:
+            file.write(f"{sha256}  {name}\n")
+        return target_path
+
+    def download(self, name: str, path: str) -> None:
+        source_path = os.path.join(self.directory, name)
+        with open(f"{source_path}.sha256") as file:
+            sha256 = file.read().split()[0]
+        temp_path = f"{path}.part"
+        shutil.copyfile(source_path, temp_path)
+        if file_digests(temp_path)['sha256'] != sha256:
+            os.remove(temp_path)
+            raise ValueError(f"El checksum de {name} no coincide con el registrado en el backup")
+        os.replace(temp_path, path)
+
+
+class S3Storage(StorageBackend):
+    def __init__(self, bucket: str, prefix: str) -> None:
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError:
+            raise RuntimeError("Para usar BACKUP_STORAGE=s3 hay que instalar boto3")
+
+        self.client = boto3.client(
+            's3',
+            endpoint_url=config('S3_ENDPOINT_URL', default=None),
+            config=Config(retries={'max_attempts': RETRY_ATTEMPTS, 'mode': 'standard'}),
+        )
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def list_names(self) -> set[str]:
+        names = set()
+        for page in self.client.get_paginator('list_objects_v2').paginate(Bucket=self.bucket, Prefix=f"{self.prefix}/"):
+            names.update(item['Key'].removeprefix(f"{self.prefix}/") for item in page.get('Contents', []))
+        return names
+
+    def upload(self, path: str, name: str, mime_type: str) -> str:
+        from boto3.s3.transfer import TransferConfig
+
+        key = f"{self.prefix}/{name}"
+        self.client.upload_file(
+            path, self.bucket, key,
+            ExtraArgs={
+                'ContentType': mime_type,
+                'ChecksumAlgorithm': 'SHA256',
+                'Metadata': {'sha256': file_digests(path)['sha256']},
+            },
+            Config=TransferConfig(multipart_threshold=CHUNK_SIZE, multipart_chunksize=CHUNK_SIZE),
+        )
+        return key
+
+    def download(self, name: str, path: str) -> None:
+        from boto3.s3.transfer import TransferConfig
+
+        key = f"{self.prefix}/{name}"
+        temp_path = f"{path}.part"
+        self.client.download_file(
+            self.bucket, key, temp_path,
+            Config=TransferConfig(multipart_threshold=CHUNK_SIZE, multipart_chunksize=CHUNK_SIZE),
+        )
+        sha256 = self.client.head_object(Bucket=self.bucket, Key=key)['Metadata'].get('sha256')
+        if sha256 is not None and file_digests(temp_path)['sha256'] != sha256:
+            os.remove(temp_path)
+            raise ValueError(f"El checksum de {name} no coincide con el registrado en S3")
+        os.replace(temp_path, path)
+
+
+def get_storage(location: str) -> StorageBackend:
+    """
+    Backend configurado en BACKUP_STORAGE (drive, local o s3) para 'db' o 'images'.
+    """
+    backend = config('BACKUP_STORAGE', default='drive')
+    if backend == 'drive':
+        folder_ids = {'db': 'ID_FOLDER', 'images': 'ID_FOLDER_IMAGES'}
+        return DriveStorage(config(folder_ids[location]))
+    if backend == 'local':
+        return LocalStorage(os.path.join(config('BACKUP_LOCAL_DIR', default='backups'), location))
+    if backend == 's3':
+        return S3Storage(config('S3_BUCKET'), location)
+    raise ValueError(f"BACKUP_STORAGE no soportado: {backend}")
@@ -0,0 +1,50 @@
+from decouple import config
+from fastapi import HTTPException, status
+from fastapi.responses import ORJSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Imagen de hasta 2MB mas los campos del formulario (el cuerpo del blog)
+MAX_BODY_SIZE = config('UPLOAD_MAX_BODY_BYTES', default=3 * 1024 * 1024, cast=int)
+
+class UploadLimitMiddleware:
+    """
+    Corta los formularios multipart que superan el limite antes de que
+    Starlette los termine de leer: por Content-Length si viene, y si no
+    contando los bytes a medida que llegan.
+    """
+    def __init__(self, app: ASGIApp, max_body_size: int) -> None:
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        headers = Headers(scope=scope)
+        if not headers.get('content-type', '').startswith('multipart/form-data'):
+            return await self.app(scope, receive, send)
+
+        content_length = headers.get('content-length', '')
+        if content_length.isdigit() and int(content_length) > self.max_body_size:
+            response = ORJSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={"detail": "La solicitud excede el tamaño máximo permitido"}
+            )
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > self.max_body_size:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="La solicitud excede el tamaño máximo permitido"
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
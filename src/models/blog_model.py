@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, Text
+from sqlalchemy import Column
 from sqlmodel import Relationship, SQLModel, Field
 import uuid
 from typing import List
@@ -7,6 +7,7 @@ from sqlalchemy import Column, Enum as SQLAlchemyEnum
 from enum import Enum
 
 from src.config.timezone import get_timezone
+from src.database.types import CompressedText
 
 class CategoryBlog(str, Enum):
     ACTIVITIY = "ACTIVIDADES"
@@ -18,7 +19,9 @@ class Blog(SQLModel, table=True):
     __tablename__ = 'blogs'
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True, index=True)
     title: str = Field(max_length=100)
-    body: str | None = Field(sa_column=Column(Text), default=None)
+    body: str | None = Field(sa_column=Column(CompressedText), default=None)
+    excerpt: str | None = Field(max_length=300, default=None)
+    reading_time: int | None = Field(default=None)
     url_image: str = Field()
     created_at: datetime = Field(default_factory=lambda: get_timezone())
     updated_at: datetime = Field(default_factory=lambda: get_timezone())
@@ -0,0 +1,8 @@
+from sqlmodel import Field, SQLModel
+
+
+class ImageReference(SQLModel, table=True):
+    __tablename__ = "image_references"
+    folder: str = Field(primary_key=True, max_length=20)
+    filename: str = Field(primary_key=True, max_length=255)
+    refs: int = Field(default=0)
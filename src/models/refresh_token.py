@@ -10,4 +10,5 @@ class HistorialRefreshToken(SQLModel, table=True):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     user_id: str = Field(foreign_key="users.id", index=True)
     token: str = Field(max_length=500)
-    refresh_token: str = Field(max_length=500)
\ No newline at end of file
+    refresh_token: str = Field(max_length=500)
+    expire: datetime | None = Field(default=None)
\ No newline at end of file
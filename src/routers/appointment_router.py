@@ -48,7 +48,7 @@ async def update(
     new_state: StateAppointment = Query(...),
     reason: str = Query(None),
     user: User = Depends(auth.get_current_user),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     if new_state == StateAppointment.REJECT and not reason:
         raise ValueError("Debe indicar el motivo del rechazo")
@@ -57,7 +57,7 @@ async def update(
 @appointment_router.put('/create', status_code= status.HTTP_200_OK)
 async def create(
     appointment_create: AppointmentCreate,
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     return await AppointmentService(session).create(appointment_create)
 
@@ -65,7 +65,7 @@ async def create(
 async def create_by_user(
     appointment_create: AppointmentCreate,
     user: User = Depends(auth.get_current_user),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     return await AppointmentService(session).create_by_user(appointment_create, user.id)
 
@@ -74,6 +74,6 @@ async def create_by_user(
 @appointment_router.post('/confirm', status_code= status.HTTP_200_OK)
 async def confirm(
     token: str = Query(...),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     return await AppointmentService(session).confirm(token)
\ No newline at end of file
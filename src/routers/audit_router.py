@@ -27,10 +27,11 @@ auth = AuthService()
 async def get_all(
   page: int = Query(1, alias="page", ge=1),
   per_page: int = Query(9, alias="per_page", ge=1, le=50),
+  after: str | None = Query(None, description="Cursor '<created_at>,<id>' devuelto en next_cursor"),
   user: User = Depends(auth.get_current_user),
   session: AsyncSession = Depends(db.get_session),
 ):
-  return await AuditService(session).get_all(page, per_page)
+  return await AuditService(session).get_all(page, per_page, after)
 
 @authorization(['admin'])
 @audit_router.get('/get/{audit_id}')
@@ -1,6 +1,6 @@
 from datetime import date, timedelta
 from typing import Optional
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 from src.database.db import db
 from src.models.user_model import User
@@ -19,7 +19,7 @@ auth = AuthService()
 async def create(
     available: AvailabilityCreate,
     user: User = Depends(auth.get_current_user),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     return await AvailabilityService(session).create(available, user)
 
@@ -27,6 +27,7 @@ async def create(
 
 @availability_router.get('/get_all/{user_id}')
 async def get_all(
+    request: Request,
     user_id: str,
     date_start: date | None = Query(None),
     date_end: date | None = Query(None),
@@ -39,15 +40,16 @@ async def get_all(
     
     if date_end and date_end < today + timedelta(days=1):
         raise ValueError("date_end debe ser igual o mayor a mañana.")
-    return await AvailabilityService(session).get_all(user_id,date_start, date_end)
+    return await AvailabilityService(session).get_all(request, user_id,date_start, date_end)
 
 @availability_router.get('/get/{available_id}')
 async def get(
+    request: Request,
     available_id: str,
     user_id: str = Query(...),
     session: AsyncSession = Depends(db.get_session),
 ):
-    return await AvailabilityService(session).get(available_id, user_id)
+    return await AvailabilityService(session).get(request, available_id, user_id)
 
 ############################### PUT ###############################
 
@@ -56,7 +58,7 @@ async def update(
     available_id: str,
     available_update: AvailabilityUpdate,
     user: User = Depends(auth.get_current_user),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     return await AvailabilityService(session).update(available_id, available_update, user.id)
 
@@ -66,7 +68,7 @@ async def update(
 async def delete(
     available_id: str,
     user: User = Depends(auth.get_current_user),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     return await AvailabilityService(session).delete(available_id, user.id)
 
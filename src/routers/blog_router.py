@@ -8,6 +8,7 @@ from src.schemas.blog_schemas.blog_update import BlogUpdate
 from src.services.auth_service import AuthService
 from src.models.blog_model import CategoryBlog
 from src.services.blog_service import BlogService
+from src.services.cache_service import blog_cache
 
 blog_router = APIRouter(prefix='/blog', tags=['Blog'])
 
@@ -23,7 +24,7 @@ async def create(
     image: UploadFile = File(...),
     favorite: str = Form(...),
     user: User = Depends(auth.get_current_user),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):  
     if favorite not in ("true", "false"):
         raise HTTPException(
@@ -57,9 +58,10 @@ async def get_all(
     request: Request,
     page: int = Query(1, alias="page", ge=1),
     per_page: int = Query(9, alias="per_page", ge=1, le=50),
+    after: str | None = Query(None, description="Cursor '<created_at>,<id>' devuelto en next_cursor"),
     session: AsyncSession = Depends(db.get_session),
 ):
-    return await BlogService(session).get_all(request, page, per_page)
+    return await BlogService(session).get_all(request, page, per_page, after)
 
 @blog_router.get('/get/{blog_id}')
 async def get(
@@ -76,14 +78,31 @@ async def get_last_blogs(
 ):
     return await BlogService(session).get_last_blogs(request)
 
+@blog_router.get('/search')
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=2, max_length=100),
+    per_page: int = Query(9, alias="per_page", ge=1, le=50),
+    after: str | None = Query(None, description="Cursor '<rank>,<rowid>' devuelto en next_cursor"),
+    session: AsyncSession = Depends(db.get_session),
+):
+    return await BlogService(session).search(request, q, per_page, after)
+
+@blog_router.get('/cache_stats')
+async def cache_stats(
+    user: User = Depends(auth.get_current_user),
+):
+    return blog_cache.stats()
+
 @blog_router.get('/get_favorites')
 async def get_favorites(
     request: Request,
     page: int = Query(1, alias="page", ge=1),
     per_page: int = Query(9, alias="per_page", ge=1, le=50),
+    after: str | None = Query(None, description="Cursor '<created_at>,<id>' devuelto en next_cursor"),
     session: AsyncSession = Depends(db.get_session),
 ):
-    return await BlogService(session).get_favorites(request, page, per_page)
+    return await BlogService(session).get_favorites(request, page, per_page, after)
 
 ############################### PUT ###############################
 
@@ -96,7 +115,7 @@ async def update(
     image: UploadFile | None = File(None),
     favorite: str = Form(...),
     user: User = Depends(auth.get_current_user),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     if favorite not in ("true", "false"):
         raise HTTPException(
@@ -129,7 +148,7 @@ async def update(
 async def delete(
     blog_id: str,
     user: User = Depends(auth.get_current_user),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     return await BlogService(session).delete(blog_id, user.id)
 
@@ -58,7 +58,7 @@ async def update(
     case_id: str,
     case_update: CaseUpdate,
     user: User = Depends(auth.get_current_user),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     return await CaseService(session).update(case_id, case_update, user.id)
 
@@ -67,7 +67,7 @@ async def update_state(
     case_id: str,
     state: StateCase = Query(...),
     user: User = Depends(auth.get_current_user),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     return await CaseService(session).update_state(case_id, state, user.id)
 
@@ -76,7 +76,7 @@ async def share_case(
     case_id: str,
     user_shared: str = Query(...),
     user: User = Depends(auth.get_current_user),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     return await CaseService(session).share_case(case_id, user_shared, user.id)
 
@@ -85,7 +85,7 @@ async def unshare_case(
     case_id: str,
     user_unshared: str = Query(...),
     user: User = Depends(auth.get_current_user),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     return await CaseService(session).unshare_case(case_id, user_unshared, user.id)
 
@@ -95,7 +95,7 @@ async def unshare_case(
 async def create(
     case: CaseCreate,
     user: User = Depends(auth.get_current_user),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     return await CaseService(session).create(case, user.id)
 
@@ -105,7 +105,7 @@ async def create(
 async def delete(
     case_id: str,
     user: User = Depends(auth.get_current_user),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     return await CaseService(session).delete(case_id, user.id)
 
@@ -52,7 +52,7 @@ async def update(
     client_id: str,
     client_update: ClientUpdate,
     user: User = Depends(auth.get_current_user),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     return await ClientService(session).update(client_id, client_update, user.id)
 
@@ -62,7 +62,7 @@ async def update(
 async def create(
     client: ClientCreate,
     user: User = Depends(auth.get_current_user),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     return await ClientService(session).create(client, user.id)
 
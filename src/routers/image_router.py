@@ -1,17 +1,33 @@
 import os
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, Request, status
 from src.services.image_service import ImageTool
 
 image_router = APIRouter(prefix='/image', tags=['Image'])
 
 @image_router.get('/get_image_blog/{file_name}')
 async def get_image_blog(
+    request: Request,
     file_name: str,
 ):
-    return await ImageTool(os.path.join('src', 'images', 'blog')).get_image(file_name)
+    return await ImageTool(os.path.join('src', 'images', 'blog')).get_image(request, file_name)
 
 @image_router.get('/get_image_user/{file_name}')
 async def get_image_user(
+    request: Request,
     file_name: str,
 ):
-    return await ImageTool(os.path.join('src', 'images', 'user')).get_image(file_name)
+    return await ImageTool(os.path.join('src', 'images', 'user')).get_image(request, file_name)
+
+@image_router.get('/{kind}/{file_name}')
+async def get_image_resized(
+    request: Request,
+    kind: str,
+    file_name: str,
+    w: int | None = Query(None, description='Ancho en pixeles, debe ser uno de los permitidos'),
+):
+    if kind not in ('blog', 'user'):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Imagen no encontrada")
+    image_tool = ImageTool(os.path.join('src', 'images', kind))
+    if w is None:
+        return await image_tool.get_image(request, file_name)
+    return await image_tool.get_resized_image(request, file_name, w)
@@ -1,14 +1,17 @@
 import logging
 import traceback
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile, logger, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from sqlmodel import text
 from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config.urls import base_url
+from src.database.counters import counters
 from src.database.db import db
 from src.models.user_model import User
 from src.schemas.user_schema.user_create import UserCreate
 from src.schemas.user_schema.user_credentials import UserCredentials
 from src.services.auth_service import AuthService, oauth_scheme
+from src.services.cache_service import blog_cache
 from src.services.user_service import UserService
 
 user_router = APIRouter(prefix='/users', tags=['User'])
@@ -34,7 +37,7 @@ async def create_user(
     last_name: str = Form(...),
     specialty: str = Form(...),
     image: UploadFile = File(...),
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     try:
         user_data = {
@@ -75,7 +78,7 @@ async def create_user(
 @user_router.post('/login')
 async def login(
     credentials:UserCredentials,
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     return await UserService(session).login(credentials)
 
@@ -83,7 +86,7 @@ async def login(
 async def login(
     refresh_token: str =  Form(),
     user: User = Depends(auth.get_current_user), 
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
     token: str = Depends(oauth_scheme),
 ):
     return await UserService(session).logout(user= user, refresh_token= refresh_token, token= token)
@@ -92,10 +95,10 @@ async def login(
 async def refresh_token(
     refresh_token: str =  Form(),
     user: tuple | bool = Depends(auth.get_user_refresh_token), 
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):
     if user == False:
-        return JSONResponse(
+        return ORJSONResponse(
             headers={"WWW-Authenticate": "Bearer"},
             status_code=status.HTTP_400_BAD_REQUEST,
             content={'detail':'Token no caducado'}
@@ -110,9 +113,7 @@ async def user(
     user: User = Depends(auth.get_current_user), 
 ): 
     user_data = user
-    scheme = request.scope.get("scheme") 
-    host = request.headers.get("host")   
-    full_url = f"{scheme}://{host}/image/get_image_user/"
+    full_url = f"{base_url(request)}/image/get_image_user/"
     user_data.url_image= full_url + user_data.url_image
     return user_data
 
@@ -134,17 +135,21 @@ async def get_users(
 
 @user_router.delete('/reset_tables')
 async def reset_tables(
-    session: AsyncSession = Depends(db.get_session),
+    session: AsyncSession = Depends(db.get_write_session),
 ):  
     await session.exec(text("DELETE FROM appointments;"))
     await session.exec(text("DELETE FROM availabilities;"))
     await session.exec(text("DELETE FROM blogs;"))
+    await session.exec(text("DELETE FROM blogs_fts;"))
+    await session.exec(text("DELETE FROM image_references WHERE folder = 'blog';"))
     await session.exec(text("DELETE FROM audits;"))
     await session.exec(text("DELETE FROM cases;"))
     await session.exec(text("DELETE FROM clients;"))
     await session.exec(text("DELETE FROM user_case;"))
     await session.commit()
-    return JSONResponse(
+    counters.clear()
+    blog_cache.clear()
+    return ORJSONResponse(
         status_code=status.HTTP_200_OK,
         content={"detail": "Tablas reiniciadas"}
     )
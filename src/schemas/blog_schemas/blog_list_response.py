@@ -0,0 +1,30 @@
+from datetime import datetime
+from pydantic import BaseModel, computed_field
+
+from src.models.blog_model import CategoryBlog
+from src.schemas.user_schema.user_response import UserResponse
+from src.config.images import image_srcset
+
+
+class BlogListResponse(BaseModel):
+    id: str
+    title: str
+    excerpt: str | None
+    reading_time: int | None
+    url_image: str
+    categories: CategoryBlog
+    favorite: bool
+    created_at: datetime
+    updated_at: datetime
+    user: UserResponse 
+
+    @computed_field
+    @property
+    def srcset(self) -> dict[str, str]:
+        return image_srcset(self.url_image)
+
+    class Config:
+        from_attributes = True
+        json_encoders = {
+            datetime: lambda v: v.isoformat() if isinstance(v, datetime) else v,
+        }
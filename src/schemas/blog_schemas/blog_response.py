@@ -1,14 +1,16 @@
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
 
 from src.models.blog_model import CategoryBlog
 from src.schemas.user_schema.user_response import UserResponse
+from src.config.images import image_srcset
 
 
 class BlogResponse(BaseModel):
     id: str
     title: str
     body: str
+    reading_time: int | None = None
     url_image: str
     categories: CategoryBlog
     favorite: bool
@@ -16,6 +18,11 @@ class BlogResponse(BaseModel):
     updated_at: datetime
     user: UserResponse 
 
+    @computed_field
+    @property
+    def srcset(self) -> dict[str, str]:
+        return image_srcset(self.url_image)
+
     class Config:
         from_attributes = True
         json_encoders = {
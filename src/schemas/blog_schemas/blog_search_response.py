@@ -0,0 +1,6 @@
+from src.schemas.blog_schemas.blog_list_response import BlogListResponse
+
+
+class BlogSearchResponse(BlogListResponse):
+    # Fragmento del texto con las coincidencias marcadas, lo completa la busqueda
+    snippet: str = ''
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
+from src.config.images import image_srcset
 
 class UserResponse(BaseModel):
     id: str
@@ -8,5 +9,10 @@ class UserResponse(BaseModel):
     specialty: str
     url_image: str
 
+    @computed_field
+    @property
+    def srcset(self) -> dict[str, str]:
+        return image_srcset(self.url_image)
+
     class Config:
         from_attributes = True
\ No newline at end of file
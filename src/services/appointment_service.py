@@ -2,11 +2,13 @@ from datetime import date, datetime, timedelta
 import logging
 import asyncio
 from fastapi import HTTPException, status
+from src.config.serialization import list_response
 from src.config.timezone import get_timezone
+from src.database.db import db
 from src.models.appointment import Appointment, StateAppointment
 from sqlmodel import between, or_, select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from src.models.user_model import User
 from src.schemas.appointment_schema.appointment_crate import AppointmentCreate
 from src.schemas.appointment_schema.appointment_response import AppointmentResponse
@@ -25,7 +27,7 @@ class AppointmentService:
             exist_appointment: Appointment | None = await self.session.get(Appointment, appointment_create.id)
 
             if exist_appointment is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={
                         "detail": "Turno no encontrado"
                         },
@@ -33,7 +35,7 @@ class AppointmentService:
                 )
             
             if exist_appointment.state != StateAppointment.NULL:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={
                         "detail": "El turno ya fue asignado"
                         },
@@ -41,7 +43,7 @@ class AppointmentService:
                 )
             
             if exist_appointment.date_get <= date.today():
-                return JSONResponse(
+                return ORJSONResponse(
                     content={
                         "detail": "La fecha debe ser posterior al día de hoy"
                         },
@@ -56,19 +58,22 @@ class AppointmentService:
             token, expire = await AuthService().create_token_appointment(exist_appointment.id, exist_appointment.user_id)
             exist_appointment.token = token
 
+            await self.session.commit()
+            logging.info("Turno asignado")
 
+            # El mail se envia con el turno de escritura ya liberado
             await EmailService().send_email_client(StateAppointment.RESERVED, exist_appointment, None, token)
             asyncio.create_task(self.delete_reserv(appointment_create.id, expire))
 
-            await self.session.commit()
-            logging.info("Turno asignado")
-
-            return JSONResponse(
+            return ORJSONResponse(
                     content={
                         "detail": "turno asignado con exito!"
                         },
                     status_code=status.HTTP_200_OK
             )
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             logging.error(f"Error al crear turno: {e}")
             await self.session.rollback()
@@ -81,7 +86,7 @@ class AppointmentService:
             exist_appointment: Appointment | None = (await self.session.exec(sttmt)).first()
 
             if exist_appointment is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={
                         "detail": "Turno no encontrado"
                         },
@@ -89,7 +94,7 @@ class AppointmentService:
                 )
             
             if exist_appointment.state != StateAppointment.NULL:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={
                         "detail": "El turno ya fue asignado"
                         },
@@ -97,7 +102,7 @@ class AppointmentService:
                 )
             
             if exist_appointment.date_get < date.today():
-                return JSONResponse(
+                return ORJSONResponse(
                     content={
                         "detail": "La fecha no puede ser anterior al día de hoy"
                         },
@@ -113,12 +118,15 @@ class AppointmentService:
             await self.session.commit()
             logging.info("Turno asignado")
 
-            return JSONResponse(
+            return ORJSONResponse(
                     content={
                         "detail": "turno asignado con exito!"
                         },
                     status_code=status.HTTP_200_OK
             )
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             logging.error(f"Error al crear turno: {e}")
             await self.session.rollback()
@@ -136,16 +144,9 @@ class AppointmentService:
            
             appointments: list[Appointment] = (await self.session.exec(sttmt)).all()
 
-            list_appointments: list[AppointmentResponse] = [
-                AppointmentResponse.model_validate(appoint).model_dump(mode='json')
-                for appoint in appointments
-            ]
             logging.info("Disponibilidades obtenidas")
 
-            return JSONResponse(
-                content= list_appointments,
-                status_code=status.HTTP_200_OK
-            )
+            return list_response(AppointmentResponse, appointments)
         except Exception as e:
             logging.error(f"Error al obtener turnos: {e}")
             raise HTTPException(
@@ -160,12 +161,12 @@ class AppointmentService:
             apointment: Appointment | None = (await self.session.exec(sttmt)).first()
 
             if apointment is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Turno no encontrado"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
             
-            return JSONResponse(
+            return ORJSONResponse(
                 content=AppointmentResponse.model_validate(apointment).model_dump(mode='json'),
                 status_code=status.HTTP_200_OK
             )
@@ -183,14 +184,14 @@ class AppointmentService:
             appointment: Appointment | None = (await self.session.exec(sttmt)).first()
 
             if appointment is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Turno no encontrado"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
             
             # if datetime.combine(apointment.date_get, apointment.start_time) >= datetime.now(timezone.utc) + timedelta(hours=2):
             if datetime.combine(appointment.date_get, appointment.start_time) <= get_timezone() + timedelta(hours=2):
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "No es posible cambiar el estado de un turno antes de 2 hrs de su inicio"},
                     status_code=status.HTTP_400_BAD_REQUEST
                 )
@@ -212,10 +213,13 @@ class AppointmentService:
             await EmailService().send_email_client(new_state, appointment_copy, reason)
 
             logging.info("Turno actualizado")
-            return JSONResponse(
+            return ORJSONResponse(
                 content= {'detail': 'Turno editado con exito!'},
                 status_code=status.HTTP_200_OK
             )
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             logging.error(f"Error al editar Turno: {e}")
             await self.session.rollback()
@@ -230,7 +234,7 @@ class AppointmentService:
             data = await AuthService().decode_token(token)
 
             if data is False:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Token expirado, realice una reserva nuevamente"},
                     status_code=status.HTTP_401_UNAUTHORIZED
                 )
@@ -242,7 +246,7 @@ class AppointmentService:
             appointment: Appointment | None = (await self.session.exec(sttmt)).first()
 
             if appointment is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Turno no encontrado"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
@@ -257,10 +261,13 @@ class AppointmentService:
             # await EmailService().send_email_lawyer(appointment, 'danielmchachagua@gmail.com')
 
             logging.info("Turno confirmado")
-            return JSONResponse(
+            return ORJSONResponse(
                 content= {'detail': 'Turno confirmado con exito!'},
                 status_code=status.HTTP_200_OK
             )
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             logging.error(f"Error al confirmar turno: {e}")
             raise HTTPException(
@@ -272,19 +279,25 @@ class AppointmentService:
         wait_seconds = (execution_time - get_timezone()).total_seconds()
         if wait_seconds > 0:
             await asyncio.sleep(wait_seconds)
-        sttmt = select(Appointment).where(Appointment.id == appointment_id
-                                    ).where(Appointment.state == StateAppointment.RESERVED
-                                    ).where(Appointment.token != None)
-        appointment: Appointment | None = (await self.session.exec(sttmt)).first()
+        # La sesion de la solicitud ya se cerro: se usa una propia, con su turno de escritura
+        try:
+            async with db.writer.turn():
+                async with db.async_write_session() as session:
+                    sttmt = select(Appointment).where(Appointment.id == appointment_id
+                                                ).where(Appointment.state == StateAppointment.RESERVED
+                                                ).where(Appointment.token != None)
+                    appointment: Appointment | None = (await session.exec(sttmt)).first()
 
-        if appointment:
-            appointment.state = StateAppointment.NULL
-            appointment.full_name = None
-            appointment.email = None
-            appointment.cellphone = None
-            appointment.reason = None
-            appointment.token = None 
-            await self.session.commit()
-            logging.info(f"Turno {appointment_id} ha sido cancelado automáticamente.")
-        else:
-            logging.error(f"Error al cancelar Turno {appointment_id}")
\ No newline at end of file
+                    if appointment:
+                        appointment.state = StateAppointment.NULL
+                        appointment.full_name = None
+                        appointment.email = None
+                        appointment.cellphone = None
+                        appointment.reason = None
+                        appointment.token = None 
+                        await session.commit()
+                        logging.info(f"Turno {appointment_id} ha sido cancelado automáticamente.")
+                    else:
+                        logging.error(f"Error al cancelar Turno {appointment_id}")
+        except Exception as e:
+            logging.error(f"Error al cancelar Turno {appointment_id}: {e}")
\ No newline at end of file
@@ -4,12 +4,14 @@ import os
 from typing import List
 import zlib
 from fastapi import HTTPException, Request, status, UploadFile
+from src.config.pagination import decode_cursor, encode_cursor
 from src.config.timezone import get_timezone
+from src.database.counters import counters
 from src.models.audit import Audit
 from src.models.blog_model import Blog
-from sqlmodel import desc, func, select
+from sqlmodel import desc, func, select, tuple_
 from sqlmodel.ext.asyncio.session import AsyncSession
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import joinedload
 from src.schemas.blog_schemas.blog_create import BlogCreate
 from src.schemas.blog_schemas.blog_response import BlogResponse
@@ -22,37 +24,59 @@ class AuditService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_all(self, page: int = 1, per_page: int = 9):
+    async def get_all(self, page: int = 1, per_page: int = 9, after: str | None = None):
         try:
             logging.info("Obteniendo audits paginados")
-            offset = (page - 1) * per_page
-            
             sttmt = (
                 select(Audit)
-                .order_by(desc(Audit.created_at))
-                .limit(per_page)
-                .offset(offset)
+                .order_by(desc(Audit.created_at), desc(Audit.id))
+                .limit(per_page + 1)
             )
+
+            if after is not None:
+                created_at, audit_id = decode_cursor(after)
+                sttmt = sttmt.where(tuple_(Audit.created_at, Audit.id) < (created_at, audit_id))
+            else:
+                sttmt = sttmt.offset((page - 1) * per_page)
             
             audits: List[Audit] = (await self.session.exec(sttmt)).unique().all()
 
-            sttmt_total = select(func.count(Audit.id))
-            total_audits = (await self.session.exec(sttmt_total)).first()
+            next_cursor = None
+            if len(audits) > per_page:
+                audits = audits[:per_page]
+                next_cursor = encode_cursor(audits[-1].created_at, audits[-1].id)
             
             list_blogs: List[BlogResponse] = [audit.model_dump(mode='json') for audit in audits]
 
             logging.info("Audits obtenidos correctamente")
+
+            if after is not None:
+                # Modo cursor: no se recorre la tabla para contar el total
+                return ORJSONResponse(
+                    content={
+                        "per_page": per_page,
+                        "total": len(audits),
+                        "next_cursor": next_cursor,
+                        "data": list_blogs
+                    },
+                    status_code=200
+                )
+
+            total_audits = await counters.get('audits', self.count)
             
-            return JSONResponse(
+            return ORJSONResponse(
                 content={
                     "page": page,
                     "per_page": per_page,
                     "total": len(audits),
                     "total_pages": (total_audits // per_page) + 1 if total_audits > 0 else 0,
+                    "next_cursor": next_cursor,
                     "data": list_blogs
                 },
                 status_code=200
             )
+        except HTTPException:
+            raise
         except Exception as e:
             logging.error(f"Error al obtener Audits: {e}")
             raise HTTPException(
@@ -60,6 +84,10 @@ class AuditService:
                 detail="Error al intentar obtener los Audits"
             )
         
+    async def count(self) -> int:
+        sttmt = select(func.count(Audit.id))
+        return (await self.session.exec(sttmt)).first()
+
     async def get(self, audit_id: str):
         try:
             logging.info("Obteniendo blog")
@@ -72,7 +100,7 @@ class AuditService:
             audit: Audit | None = (await self.session.exec(sttmt)).first()
 
             if audit is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Audit no encontrado"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
@@ -82,7 +110,7 @@ class AuditService:
            
             logging.info("Audit obtenido")
 
-            return JSONResponse(
+            return ORJSONResponse(
                 content={
                     "audit": audit_data,
                     "user": user_data
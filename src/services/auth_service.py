@@ -82,7 +82,13 @@ class AuthService:
             logging.error("Error al decodificar token")
             return None
 
-    async def get_current_user(self, token: Annotated[str, Depends(oauth_scheme)], session: AsyncSession = Depends(db.get_session)):
+    async def load_user(self, user_id: str) -> User | None:
+        # Sesion propia que se cierra enseguida: si la ruta espera el turno de escritura
+        # no retiene una conexion del pool de lectura mientras tanto
+        async with db.async_session() as session:
+            return await session.get(User, user_id)
+
+    async def get_current_user(self, token: Annotated[str, Depends(oauth_scheme)]):
         try:
             logging.info("Obteniendo usuario actual")
             if not token:
@@ -101,7 +107,7 @@ class AuthService:
                     headers={"WWW-Authenticate": "Bearer"},
                 )
 
-            user: User | None = await session.get(User, data['user_id'] )
+            user: User | None = await self.load_user(data['user_id'])
 
             if not user:
                 raise HTTPException(
@@ -119,7 +125,7 @@ class AuthService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-    async def get_user_refresh_token(self, token: Annotated[str, Depends(oauth_scheme)], session: AsyncSession = Depends(db.get_session)):
+    async def get_user_refresh_token(self, token: Annotated[str, Depends(oauth_scheme)]):
         try:
             if not token:
                 raise HTTPException(
@@ -142,7 +148,7 @@ class AuthService:
             if get_timezone() < expire:
                 return False
 
-            user: User | None = await session.get(User, data['user_id'])
+            user: User | None = await self.load_user(data['user_id'])
 
             if not user:
                 raise HTTPException(
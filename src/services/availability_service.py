@@ -1,11 +1,12 @@
 from datetime import date, datetime, time, timedelta
 import logging
-from fastapi import HTTPException, status 
+from fastapi import HTTPException, Request, status 
+from src.config.etag import json_with_etag
 from src.models.appointment import Appointment, StateAppointment
 from src.models.availability import Availability
 from sqlmodel import asc, between, select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import joinedload
 from src.models.user_model import User
 from src.schemas.appointment_schema.appointment_dto import AppointmentDto
@@ -93,7 +94,7 @@ class AvailabilityService:
             available_exist: Availability | None = (await self.session.exec(sttmt_exist)).first()
 
             if available_exist is not None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Ya existe la disponibilidad del día"},
                     status_code=status.HTTP_400_BAD_REQUEST
                 )
@@ -126,10 +127,13 @@ class AvailabilityService:
             await self.session.commit()
             logging.info("Disponibilidad creada!")
 
-            return JSONResponse(
+            return ORJSONResponse(
                 content={"new_available": new_available.id},
                 status_code=status.HTTP_201_CREATED
             )
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             logging.error(f"Error al crear disponibilidad: {e}")
             await self.session.rollback()
@@ -139,7 +143,7 @@ class AvailabilityService:
             )
 
 
-    async def get_all(self, user_id: str, date_start: date = None, date_end: date = None):
+    async def get_all(self, request: Request, user_id: str, date_start: date = None, date_end: date = None):
         try:
             logging.info("Obteniendo Availabilities")
             if date_start is not None and date_end is not None:
@@ -170,10 +174,7 @@ class AvailabilityService:
             ]
             logging.info("Disponibilidades obtenidas")
 
-            return JSONResponse(
-                content= list_availabilities,
-                status_code=status.HTTP_200_OK
-            )
+            return json_with_etag(request, list_availabilities)
         except Exception as e:
             logging.error(f"Error al obtener disponibilidad: {e}")
             raise HTTPException(
@@ -181,7 +182,7 @@ class AvailabilityService:
                 detail="Error al intentar obtener la disponibilidad"
             )
         
-    async def get(self, available_id: str, user_id: str):
+    async def get(self, request: Request, available_id: str, user_id: str):
         try:
             logging.info("Obteniendo disponibilidad")
             sttmt = select(Availability).options(
@@ -193,13 +194,13 @@ class AvailabilityService:
             exist_available: Availability | None = (await self.session.exec(sttmt)).first()
 
             if exist_available is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Disponibilidad no encontrada"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
             
             if exist_available.user_id != user_id:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Disponibilidad erronea"},
                     status_code=status.HTTP_400_BAD_REQUEST
                 )
@@ -210,12 +211,12 @@ class AvailabilityService:
             
             logging.info("Disponibilidad obtenida")
 
-            return JSONResponse(
-                content=AvailabilityResponseDto.model_validate({
+            return json_with_etag(
+                request,
+                AvailabilityResponseDto.model_validate({
                     **exist_available.model_dump(),
                     "appointments": appointments_data
-                }).model_dump(mode='json'),
-                status_code=status.HTTP_200_OK
+                }).model_dump(mode='json')
             )
         except Exception as e:
             logging.error(f"Error al obtener disponibilidad: {e}")
@@ -344,19 +345,19 @@ class AvailabilityService:
             available: Availability | None = (await self.session.exec(sttmt)).first()
 
             if available is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Disponibilidad no encontrada"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
 
             if available.user_id != user_id:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "No tiene permiso para editar disponibilidad"},
                     status_code=status.HTTP_403_FORBIDDEN
                 )
 
             if available.date_all == date.today():
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "No se puede modificar la fecha de hoy"},
                     status_code=status.HTTP_400_BAD_REQUEST
                 )
@@ -398,7 +399,7 @@ class AvailabilityService:
                 await self.session.commit()
 
                 logging.info("Disponibilidad actualizada")
-                return JSONResponse(
+                return ORJSONResponse(
                     content={'detail': 'Disponibilidad editada con éxito!'},
                     status_code=status.HTTP_200_OK
                 )
@@ -412,18 +413,18 @@ class AvailabilityService:
 
             for appt in active_appts:
                 if not any(start <= appt.start_time <= end for start, end in updated_ranges):
-                    return JSONResponse(
+                    return ORJSONResponse(
                         content={"detail": f"No se puede modificar el horario. Existen turnos activos fuera del nuevo rango: {appt.start_time.strftime('%H:%M')}"},
                         status_code=status.HTTP_400_BAD_REQUEST
                     )
 
-            # Eliminar turnos no activos
+            # Eliminar turnos no activos, los mails se envian despues del commit
             appointment_save = []
+            rejected = []
             for appoint in available.appointments:
                 if appoint.state in [StateAppointment.NULL, StateAppointment.CANCEL, StateAppointment.REJECT, StateAppointment.RESERVED]:
                     if appoint.state == StateAppointment.RESERVED:
-                        reason = "Se ha modificado la disponibilidad del día, por favor contactarte nuevamente con SIJAC, o enviar un turno nuevo desde nuestra web"
-                        await EmailService().send_email_client(StateAppointment.REJECT, appoint, reason)
+                        rejected.append(appoint)
                     await self.session.delete(appoint)
                 else:
                     appointment_save.append(appoint.start_time)
@@ -455,12 +456,19 @@ class AvailabilityService:
 
             await self.session.commit()
 
+            reason = "Se ha modificado la disponibilidad del día, por favor contactarte nuevamente con SIJAC, o enviar un turno nuevo desde nuestra web"
+            for appoint in rejected:
+                await EmailService().send_email_client(StateAppointment.REJECT, appoint, reason)
+
             logging.info("Disponibilidad actualizada")
-            return JSONResponse(
+            return ORJSONResponse(
                 content={'detail': 'Disponibilidad editada con éxito!'},
                 status_code=status.HTTP_200_OK
             )
 
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             logging.error(f"Error al editar disponibilidad: {e}")
             await self.session.rollback()
@@ -481,33 +489,41 @@ class AvailabilityService:
             available: Availability | None = await self.session.get(Availability, available_id)
             
             if available is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Disponibilidad no encontrada"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
             
             if available.user_id != user_id:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "No tiene permiso para eliminar disponibilidad"},
                     status_code=status.HTTP_403_FORBIDDEN
                 )
             
+            # Los mails se envian despues del commit, sin el turno de escritura
+            rejected = []
             for appointment in available.appointments:
                 if appointment.state == StateAppointment.PENDING or appointment.state == StateAppointment.ACCEPT:
-                    reason = "Se ha eliminado la disponibilidad del día, por favor contactarte nuevamente con SIJAC, o enviar un nuevamente desde nuestra web"
-                    await EmailService().send_email_client(StateAppointment.REJECT, appointment, reason)
+                    rejected.append(appointment)
                 await self.session.delete(appointment)
             
             await self.session.delete(available)
 
             await self.session.commit()
 
+            reason = "Se ha eliminado la disponibilidad del día, por favor contactarte nuevamente con SIJAC, o enviar un nuevamente desde nuestra web"
+            for appointment in rejected:
+                await EmailService().send_email_client(StateAppointment.REJECT, appointment, reason)
+
             logging.info("Disponibilidad eliminada")
 
-            JSONResponse(
+            ORJSONResponse(
                 content= {"detail": "Disponibilidad eliminada con exito!"},
                 status_code=status.HTTP_200_OK
             )
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             logging.error(f"Error al eliminar Disponibilidad: {e}")
             await self.session.rollback()
@@ -1,19 +1,26 @@
-import base64
 import logging
+import math
 import os
 from typing import List
-import zlib
 from fastapi import HTTPException, Request, status, UploadFile
+from src.config.etag import etag_matches, make_etag, not_modified
+from src.config.pagination import decode_cursor, decode_rank_cursor, encode_cursor, encode_rank_cursor
+from src.config.serialization import json_bytes_response, list_adapter, list_body, page_body
 from src.config.timezone import get_timezone
+from src.config.urls import base_url
+from src.database.counters import counters
 from src.models.blog_model import Blog
-from sqlmodel import desc, func, select
+from sqlmodel import desc, func, select, text, tuple_
 from sqlmodel.ext.asyncio.session import AsyncSession
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import joinedload
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import defer, joinedload
 from src.schemas.blog_schemas.blog_create import BlogCreate
+from src.schemas.blog_schemas.blog_list_response import BlogListResponse
+from src.schemas.blog_schemas.blog_search_response import BlogSearchResponse
 from src.schemas.blog_schemas.blog_response import BlogResponse
 from src.schemas.blog_schemas.blog_update import BlogUpdate
 from src.schemas.user_schema.user_response import UserResponse
+from src.services.cache_service import blog_cache
 from src.services.image_service import ImageTool
 
 
@@ -23,139 +30,128 @@ class BlogService:
         self.path_image = os.path.join("src", "images", "blog")
 
     async def create(self, blog: BlogCreate, image: UploadFile):
+        image_tool = ImageTool(os.path.join('src', 'images', 'blog'))
+        new_image = None
         try:
             logging.info("Creando blog")
-            new_image = await ImageTool(os.path.join('src', 'images', 'blog')).save_image(image)
+            new_image = await image_tool.save_image(image)
 
             if new_image is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={
                         "detail": "Error al guardar la imagen"
                         },
                     status_code=status.HTTP_424_FAILED_DEPENDENCY
                 )
             
-            new_blog: Blog = Blog(**blog.model_dump(), url_image= new_image)
+            excerpt, reading_time = self.summarize(blog.body)
+            new_blog: Blog = Blog(**blog.model_dump(), url_image= new_image, excerpt= excerpt, reading_time= reading_time)
 
             self.session.add(new_blog)
+            await image_tool.add_reference(self.session, new_image)
+            await self.session.flush()
+            await self.index_search(new_blog.id, new_blog.title, blog.body)
 
             await self.session.commit()
 
+            counters.incr(('blogs', new_blog.favorite))
+            blog_cache.clear()
+
             logging.info("Blog creado!")
 
-            return JSONResponse(
+            return ORJSONResponse(
                     content={
                         "blog_id": new_blog.id
                         },
                     status_code=status.HTTP_201_CREATED
             )
+        except HTTPException:
+            await self.session.rollback()
+            if new_image:
+                await image_tool.delete_if_unreferenced(self.session, new_image)
+            raise
         except Exception as e:
             logging.error(f"Error al crear blog: {e}")
-            if new_image:
-                ImageTool(os.path.join('src', 'images', 'blog')).delete_image(new_image)
             await self.session.rollback()
+            if new_image:
+                await image_tool.delete_if_unreferenced(self.session, new_image)
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Error al intentar crear el blog")
 
-    async def get_all(self, request: Request, page: int = 1, per_page: int = 9):
-        try:
-            logging.info("Obteniendo blogs paginados")
-            offset = (page - 1) * per_page
-            
-            sttmt = (
-                select(Blog)
-                .options(joinedload(Blog.user))
-                .order_by(desc(Blog.created_at))
-                .limit(per_page)
-                .offset(offset)
-                .where(Blog.favorite == False)
-            )
-            
-            blogs: List[Blog] = (await self.session.exec(sttmt)).unique().all()
+    async def get_all(self, request: Request, page: int = 1, per_page: int = 9, after: str | None = None):
+        return await self.get_page(request, False, page, per_page, after)
 
-            sttmt_total = select(func.count(Blog.id))
-            total_blogs = (await self.session.exec(sttmt_total)).first()
-            
-            scheme = request.scope.get("scheme") 
-            host = request.headers.get("host")   
-            full_url = f"{scheme}://{host}/image/get_image_blog/"
-            
-            list_blogs: List[BlogResponse] = []
+    async def get_favorites(self, request: Request, page: int = 1, per_page: int = 9, after: str | None = None):
+        return await self.get_page(request, True, page, per_page, after)
 
-            for blog in blogs:
-                blog.url_image = full_url + blog.url_image if not blog.url_image.startswith("http") else blog.url_image
-                if not blog.user.url_image.startswith("http"):
-                    blog.user.url_image = f"{scheme}://{host}/image/get_image_user/{blog.user.url_image}"
-                user_data = UserResponse.model_validate(blog.user).model_dump(mode='json')
-                blog_data = BlogResponse.model_validate(blog).model_dump(mode='json')
-                blog_data['user'] = user_data
-                list_blogs.append(blog_data)
-            
-            logging.info("Blogs obtenidos correctamente")
-            
-            return JSONResponse(
-                content={
-                    "page": page,
-                    "per_page": per_page,
-                    "total": len(blogs),
-                    "total_pages": (total_blogs // per_page) + 1 if total_blogs > 0 else 0,
-                    "data": list_blogs
-                },
-                status_code=200
-            )
-        except Exception as e:
-            logging.error(f"Error al obtener blogs: {e}")
-            raise HTTPException(
-                status_code=500,
-                detail="Error al intentar obtener los blogs"
-            )
-        
-
-    async def get_favorites(self, request: Request, page: int = 1, per_page: int = 9):
+    async def get_page(self, request: Request, favorite: bool, page: int, per_page: int, after: str | None):
         try:
             logging.info("Obteniendo blogs paginados")
-            offset = (page - 1) * per_page
-            
+            cache_key = ('get_page', favorite, page, per_page, after, base_url(request))
+            cached = blog_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            version = blog_cache.version
+
             sttmt = (
                 select(Blog)
-                .options(joinedload(Blog.user))
-                .order_by(desc(Blog.created_at))
-                .limit(per_page)
-                .offset(offset)
-                .where(Blog.favorite == True)
+                .options(joinedload(Blog.user), defer(Blog.body))
+                .where(Blog.favorite == favorite)
+                .order_by(desc(Blog.created_at), desc(Blog.id))
+                .limit(per_page + 1)
             )
-            
+
+            if after is not None:
+                created_at, blog_id = decode_cursor(after)
+                sttmt = sttmt.where(tuple_(Blog.created_at, Blog.id) < (created_at, blog_id))
+            else:
+                sttmt = sttmt.offset((page - 1) * per_page)
+
             blogs: List[Blog] = (await self.session.exec(sttmt)).unique().all()
 
-            sttmt_total = select(func.count(Blog.id))
-            total_blogs = (await self.session.exec(sttmt_total)).first()
-            
-            scheme = request.scope.get("scheme") 
-            host = request.headers.get("host")   
-            full_url = f"{scheme}://{host}/image/get_image_blog/"
-            
-            list_blogs: List[BlogResponse] = []
+            next_cursor = None
+            if len(blogs) > per_page:
+                blogs = blogs[:per_page]
+                next_cursor = encode_cursor(blogs[-1].created_at, blogs[-1].id)
+
+            total_blogs = None
+            if after is None:
+                total_blogs = await counters.get(('blogs', favorite), lambda: self.count(favorite))
 
+            base = base_url(request)
+            full_url = f"{base}/image/get_image_blog/"
+            
             for blog in blogs:
                 blog.url_image = full_url + blog.url_image if not blog.url_image.startswith("http") else blog.url_image
                 if not blog.user.url_image.startswith("http"):
-                    blog.user.url_image = f"{scheme}://{host}/image/get_image_user/{blog.user.url_image}"
-                user_data = UserResponse.model_validate(blog.user).model_dump(mode='json')
-                blog_data = BlogResponse.model_validate(blog).model_dump(mode='json')
-                blog_data['user'] = user_data
-                list_blogs.append(blog_data)
+                    blog.user.url_image = f"{base}/image/get_image_user/{blog.user.url_image}"
+
+            list_blogs: bytes = list_body(BlogListResponse, blogs)
             
             logging.info("Blogs obtenidos correctamente")
+
+            if total_blogs is None:
+                # Modo cursor: no se recorre la tabla para contar el total
+                return blog_cache.set(cache_key, version, json_bytes_response(page_body(
+                    {
+                        "per_page": per_page,
+                        "total": len(blogs),
+                        "next_cursor": next_cursor,
+                    },
+                    list_blogs
+                )))
             
-            return JSONResponse(
-                content={
+            return blog_cache.set(cache_key, version, json_bytes_response(page_body(
+                {
                     "page": page,
                     "per_page": per_page,
                     "total": len(blogs),
                     "total_pages": (total_blogs // per_page) + 1 if total_blogs > 0 else 0,
-                    "data": list_blogs
+                    "next_cursor": next_cursor,
                 },
-                status_code=200
-            )
+                list_blogs
+            )))
+        except HTTPException:
+            raise
         except Exception as e:
             logging.error(f"Error al obtener blogs: {e}")
             raise HTTPException(
@@ -173,29 +169,34 @@ class BlogService:
                 )
            
             blog: Blog | None = (await self.session.exec(sttmt)).first()
-
-            scheme = request.scope.get("scheme") 
-            host = request.headers.get("host")   
-            full_url = f"{scheme}://{host}/image/get_image_blog/"
-            blog.url_image = full_url + blog.url_image if not blog.url_image.startswith("http") else blog.url_image
             
             if blog is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Blog no encontrado"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
+
+            base = base_url(request)
+
+            etag = make_etag(blog.id, blog.updated_at, blog.user.id, blog.user.updated_at, base)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+            full_url = f"{base}/image/get_image_blog/"
+            blog.url_image = full_url + blog.url_image if not blog.url_image.startswith("http") else blog.url_image
             
             if not blog.user.url_image.startswith("http"):
-                blog.user.url_image = f"{scheme}://{host}/image/get_image_user/{blog.user.url_image}"
+                blog.user.url_image = f"{base}/image/get_image_user/{blog.user.url_image}"
             user_data = UserResponse.model_validate(blog.user).model_dump(mode='json')
             blog_data = BlogResponse.model_validate(blog).model_dump(mode='json')
             blog_data['user'] = user_data
 
             logging.info("Blog obtenido")
 
-            return JSONResponse(
+            return ORJSONResponse(
                 content=blog_data,
-                status_code=status.HTTP_200_OK
+                status_code=status.HTTP_200_OK,
+                headers={'ETag': etag}
             )
         except Exception as e:
             logging.error(f"Error al obtener blog: {e}")
@@ -205,8 +206,20 @@ class BlogService:
             )
         
     async def update(self, blog: BlogUpdate, image: UploadFile | None, user_id: str):
+        image_tool = ImageTool(os.path.join('src', 'images', 'blog'))
+        file_name = None
         try:
             logging.info("Actualizando blog")
+            # La imagen se procesa antes de la primera consulta para no retener el turno de escritura
+            if image is not None:
+                file_name = await image_tool.save_image(image)
+
+                if file_name is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail="Error al intentar editar el blog"
+                    )
+
             sttmt = select(Blog).where(
                     Blog.id == blog.id,
                 )
@@ -214,47 +227,60 @@ class BlogService:
             exist_blog: Blog | None = (await self.session.exec(sttmt)).first()
             
             if exist_blog is None:
-                return JSONResponse(
-                    content={"detail": "Blog no encontrado"},
-                    status_code=status.HTTP_404_NOT_FOUND
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Blog no encontrado"
                 )
             
             if exist_blog.user_id != user_id:
-                return JSONResponse(
-                    content={"detail": "No tienes permiso para editar este blog"},
-                    status_code=status.HTTP_403_FORBIDDEN
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="No tienes permiso para editar este blog"
                 )
             
+            old_favorite = exist_blog.favorite
+            await self.index_search(exist_blog.id, blog.title, blog.body)
+
             exist_blog.title = blog.title
             exist_blog.body = blog.body
+            exist_blog.excerpt, exist_blog.reading_time = self.summarize(blog.body)
             exist_blog.categories = blog.categories
             exist_blog.favorite = blog.favorite
             exist_blog.updated_at = get_timezone()
 
-            if image is not None:
-                image_tool = ImageTool(os.path.join('src', 'images', 'blog'))
-                file_name = await image_tool.save_image(image)
-
-                if file_name is None:
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail="Error al intentar editar el blog"
-                    )
-                
-                await image_tool.delete_image(exist_blog.url_image)
+            old_image = None
+            if file_name is not None:
+                old_image = exist_blog.url_image
+                await image_tool.add_reference(self.session, file_name)
+                await image_tool.release_reference(self.session, old_image)
 
                 exist_blog.url_image = file_name
 
             await self.session.commit()
 
+            if old_image is not None:
+                await image_tool.delete_if_unreferenced(self.session, old_image)
+
+            if old_favorite != exist_blog.favorite:
+                counters.incr(('blogs', old_favorite), -1)
+                counters.incr(('blogs', exist_blog.favorite))
+            blog_cache.clear()
+
             logging.info("Blog actualizado")
-            return JSONResponse(
+            return ORJSONResponse(
                 content= {'detail': 'Blog editado con exito!'},
                 status_code=status.HTTP_200_OK
             )
+        except HTTPException:
+            await self.session.rollback()
+            if file_name:
+                await image_tool.delete_if_unreferenced(self.session, file_name)
+            raise
         except Exception as e:
             logging.error(f"Error al editar blog: {e}")
             await self.session.rollback()
+            if file_name:
+                await image_tool.delete_if_unreferenced(self.session, file_name)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Error al intentar obtener el blog"
@@ -267,29 +293,38 @@ class BlogService:
             blog: Blog | None = (await self.session.exec(sttmt)).first()
             
             if blog is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Blog no encontrado"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
             
             if blog.user_id != user_id:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "No tienes permiso para eliminar este blog"},
                     status_code=status.HTTP_403_FORBIDDEN
                 )
             
+            image_tool = ImageTool(os.path.join('src', 'images', 'blog'))
+            await self.index_search(blog.id)
             await self.session.delete(blog)
-
-            await ImageTool(os.path.join('src', 'images', 'blog')).delete_image(blog.url_image)
+            await image_tool.release_reference(self.session, blog.url_image)
 
             await self.session.commit()
 
+            await image_tool.delete_if_unreferenced(self.session, blog.url_image)
+
+            counters.incr(('blogs', blog.favorite), -1)
+            blog_cache.clear()
+
             logging.info("Blog eliminado")
 
-            return JSONResponse(
+            return ORJSONResponse(
                 content= {"detail": "Blog eliminado con exito!"},
                 status_code=status.HTTP_200_OK
             )
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             logging.error(f"Error al eliminar blog: {e}")
             await self.session.rollback()
@@ -301,42 +336,35 @@ class BlogService:
     async def get_last_blogs(self, request: Request):
         try:
             logging.info("Obteniendo blogs paginados")
+            cache_key = ('get_last_blogs', base_url(request))
+            cached = blog_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            version = blog_cache.version
+
             sttmt = (
                 select(Blog)
-                .options(joinedload(Blog.user))
+                .options(joinedload(Blog.user), defer(Blog.body))
                 .order_by(desc(Blog.created_at))
                 .limit(3)
                 .offset(0)
                 )
             
             blogs: List[Blog] = (await self.session.exec(sttmt)).unique().all()
-
-            sttmt_total = select(func.count(Blog.id))
-            total_blogs = (await self.session.exec(sttmt_total)).first()
             
-            scheme = request.scope.get("scheme") 
-            host = request.headers.get("host")   
-            full_url = f"{scheme}://{host}/image/get_image_blog/"
+            base = base_url(request)
+            full_url = f"{base}/image/get_image_blog/"
             
-            list_blogs: List[BlogResponse] = []
-
             for blog in blogs:
                 blog.url_image = full_url + blog.url_image if not blog.url_image.startswith("http") else blog.url_image
                 if not blog.user.url_image.startswith("http"):
-                    blog.user.url_image = f"{scheme}://{host}/image/get_image_user/{blog.user.url_image}"
-                user_data = UserResponse.model_validate(blog.user).model_dump(mode='json')
-                blog_data = BlogResponse.model_validate(blog).model_dump(mode='json')
-                blog_data['user'] = user_data
-                list_blogs.append(blog_data)
+                    blog.user.url_image = f"{base}/image/get_image_user/{blog.user.url_image}"
+
+            list_blogs: bytes = list_body(BlogListResponse, blogs)
             
             logging.info("Blogs obtenidos correctamente")
             
-            return JSONResponse(
-                content={
-                    "data": list_blogs
-                },
-                status_code=200
-            )
+            return blog_cache.set(cache_key, version, json_bytes_response(page_body({}, list_blogs)))
         except Exception as e:
             logging.error(f"Error al obtener blogs: {e}")
             raise HTTPException(
@@ -344,10 +372,113 @@ class BlogService:
                 detail="Error al intentar obtener los blogs"
             )
         
-    async def compress_string(self, data):
-        compressed = zlib.compress(data.encode('utf-8'))
-        return base64.b64encode(compressed).decode('utf-8')
-    
-    async def decompress_string(self, compressed_data):
-        compressed = base64.b64decode(compressed_data.encode('utf-8'))
-        return zlib.decompress(compressed).decode('utf-8')
+    async def search(self, request: Request, q: str, per_page: int = 9, after: str | None = None):
+        try:
+            logging.info("Buscando blogs")
+            match = self.fts_query(q)
+            if match is None:
+                return ORJSONResponse(
+                    content={"per_page": per_page, "total": 0, "next_cursor": None, "data": []},
+                    status_code=status.HTTP_200_OK
+                )
+
+            cursor_filter = ""
+            params = {"q": match, "limit": per_page + 1}
+            if after is not None:
+                params["rank"], params["rowid"] = decode_rank_cursor(after)
+                cursor_filter = "AND (score > :rank OR (score = :rank AND blogs.rowid > :rowid))"
+
+            # bm25 pondera el titulo 10 veces mas que el cuerpo
+            sttmt = text(f"""
+                SELECT blogs.id, blogs.rowid AS blog_rowid, bm25(blogs_fts, 10.0, 1.0) AS score,
+                    snippet(blogs_fts, 1, '<mark>', '</mark>', '...', 24) AS snippet
+                FROM blogs_fts JOIN blogs ON blogs.rowid = blogs_fts.rowid
+                WHERE blogs_fts MATCH :q {cursor_filter}
+                ORDER BY score, blogs.rowid
+                LIMIT :limit
+            """).bindparams(**params)
+            rows = (await self.session.exec(sttmt)).all()
+
+            next_cursor = None
+            if len(rows) > per_page:
+                rows = rows[:per_page]
+                next_cursor = encode_rank_cursor(rows[-1].score, rows[-1].blog_rowid)
+
+            sttmt_blogs = select(Blog).options(joinedload(Blog.user), defer(Blog.body)).where(Blog.id.in_([row.id for row in rows]))
+            blogs_by_id = {blog.id: blog for blog in (await self.session.exec(sttmt_blogs)).unique().all()}
+            blogs: List[Blog] = [blogs_by_id[row.id] for row in rows if row.id in blogs_by_id]
+
+            base = base_url(request)
+            full_url = f"{base}/image/get_image_blog/"
+
+            for blog in blogs:
+                blog.url_image = full_url + blog.url_image if not blog.url_image.startswith("http") else blog.url_image
+                if not blog.user.url_image.startswith("http"):
+                    blog.user.url_image = f"{base}/image/get_image_user/{blog.user.url_image}"
+
+            adapter = list_adapter(BlogSearchResponse)
+            results: List[BlogSearchResponse] = adapter.validate_python(blogs, from_attributes=True)
+            snippets = {row.id: row.snippet for row in rows}
+            for result in results:
+                result.snippet = snippets[result.id]
+
+            logging.info("Busqueda de blogs realizada")
+
+            return json_bytes_response(page_body(
+                {
+                    "per_page": per_page,
+                    "total": len(results),
+                    "next_cursor": next_cursor,
+                },
+                adapter.dump_json(results)
+            ))
+        except HTTPException:
+            raise
+        except Exception as e:
+            logging.error(f"Error al buscar blogs: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error al intentar buscar blogs"
+            )
+
+    async def index_search(self, blog_id: str, title: str | None = None, body: str | None = None) -> None:
+        """
+        Reemplaza el blog en el indice FTS, o lo quita si no se pasa el texto.
+        El indice guarda su propia copia en texto plano: blogs tiene el cuerpo
+        comprimido y leerlo desde SQL necesitaria decompress_text en cada conexion.
+        """
+        blog_rowid = "SELECT rowid FROM blogs WHERE id = :id"
+        await self.session.exec(text(f"DELETE FROM blogs_fts WHERE rowid IN ({blog_rowid})").bindparams(id=blog_id))
+        if title is not None:
+            await self.session.exec(text(
+                "INSERT INTO blogs_fts(rowid, title, body) SELECT rowid, :title, :body FROM blogs WHERE id = :id"
+            ).bindparams(id=blog_id, title=title, body=body))
+
+    @classmethod
+    def fts_query(cls, q: str) -> str | None:
+        """
+        Convierte el texto del usuario en una consulta FTS5 segura:
+        cada palabra entre comillas y la ultima como prefijo.
+        """
+        words = [word.replace('"', '""') for word in q.split()]
+        if not words:
+            return None
+        terms = [f'"{word}"' for word in words]
+        terms[-1] += '*'
+        return ' '.join(terms)
+
+    @staticmethod
+    def summarize(body: str, max_length: int = 200, words_per_minute: int = 200) -> tuple[str, int]:
+        """
+        Extracto para las tarjetas del listado y tiempo de lectura en minutos.
+        """
+        text = ' '.join(body.split())
+        reading_time = max(1, math.ceil(len(text.split()) / words_per_minute))
+        if len(text) <= max_length:
+            return text, reading_time
+        cut = text[:max_length].rsplit(' ', 1)[0]
+        return f"{cut}...", reading_time
+
+    async def count(self, favorite: bool) -> int:
+        sttmt = select(func.count(Blog.id)).where(Blog.favorite == favorite)
+        return (await self.session.exec(sttmt)).first()
@@ -0,0 +1,60 @@
+import logging
+from typing import Hashable
+from cachetools import TTLCache
+from decouple import config
+from fastapi import Response
+from src.config.serialization import json_bytes_response
+
+
+class ResponseCache:
+    """
+    Cache en memoria (TTL + LRU) de respuestas JSON ya serializadas.
+    Se invalida completo ante cualquier escritura que afecte su contenido.
+    Quien va a guardar una respuesta toma `version` antes de consultar la base:
+    si hubo un clear() mientras tanto la respuesta puede estar vieja y no se guarda.
+    """
+    def __init__(self, name: str, maxsize: int, ttl: int) -> None:
+        self.name = name
+        self.cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Response | None:
+        cached = self.cache.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        body, status_code = cached
+        return json_bytes_response(body, status_code)
+
+    def set(self, key: Hashable, version: int, response: Response) -> Response:
+        if response.status_code == 200 and version == self.version:
+            self.cache[key] = (response.body, response.status_code)
+        return response
+
+    def clear(self) -> None:
+        self.version += 1
+        self.cache.clear()
+        logging.info(f"Cache {self.name} invalidada")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": self.cache.currsize,
+            "maxsize": self.cache.maxsize,
+            "ttl": self.cache.ttl,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+blog_cache = ResponseCache(
+    'blog',
+    maxsize=config('BLOG_CACHE_SIZE', default=256, cast=int),
+    ttl=config('BLOG_CACHE_TTL', default=300, cast=int),
+)
@@ -6,7 +6,7 @@ from src.config.timezone import get_timezone
 from src.models.appointment import Appointment, StateAppointment
 from sqlmodel import between, select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from src.models.case import Case, StateCase
 from src.models.user_case import UserCase, TypePermision
 from src.models.user_case import UserCase
@@ -49,12 +49,15 @@ class CaseService:
 
             logging.info("Caso creado!")
 
-            return JSONResponse(
+            return ORJSONResponse(
                 content={
                     "case_id": new_case.id
                     },
                 status_code=status.HTTP_201_CREATED
             )
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             logging.error(f"Error al crear caso: {e}")
             await self.session.rollback()
@@ -99,7 +102,7 @@ class CaseService:
 
             logging.info("Casos obtenidos")
 
-            return JSONResponse(
+            return ORJSONResponse(
                 content= list_cases,
                 status_code=status.HTTP_200_OK
             )
@@ -136,7 +139,7 @@ class CaseService:
             case: Case | None = (await self.session.exec(sttmt)).first()
 
             if case is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Caso no encontrado"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
@@ -160,7 +163,7 @@ class CaseService:
                 users=[UserResponse(**uc.user.model_dump()).model_dump(mode='json') for uc in case.users] if case.users else []
             )
             
-            return JSONResponse(
+            return ORJSONResponse(
                 content= case_response.model_dump(mode='json'),
                 status_code=status.HTTP_200_OK
             )
@@ -227,7 +230,7 @@ class CaseService:
 
             logging.info("Casos obtenidos con exito")
             
-            return JSONResponse(
+            return ORJSONResponse(
                 content=list_cases,
                 status_code=status.HTTP_200_OK
             )
@@ -304,7 +307,7 @@ class CaseService:
 
             logging.info("Casos obtenidos con exito")
             
-            return JSONResponse(
+            return ORJSONResponse(
                 content=list_cases,
                 status_code=status.HTTP_200_OK
             )
@@ -327,7 +330,7 @@ class CaseService:
             case: Case | None = (await self.session.exec(sttmt)).first()
 
             if case is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Caso no encontrado"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
@@ -338,10 +341,13 @@ class CaseService:
 
             logging.info("Caso editado con exito")
             
-            return JSONResponse(
+            return ORJSONResponse(
                 content= {"detail": "Caso actualizado"},
                 status_code=status.HTTP_200_OK
             )
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             logging.error(f"Error al obtener caso: {e}")
             raise HTTPException(
@@ -361,7 +367,7 @@ class CaseService:
             case: Case | None = (await self.session.exec(sttmt)).first()
 
             if case is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Caso no encontrado"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
@@ -371,10 +377,13 @@ class CaseService:
 
             logging.info("Caso editado con exito")
             
-            return JSONResponse(
+            return ORJSONResponse(
                 content= {"detail": "Caso actualizado"},
                 status_code=status.HTTP_200_OK
             )
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             logging.error(f"Error al obtener caso: {e}")
             raise HTTPException(
@@ -394,7 +403,7 @@ class CaseService:
             case: Case | None = (await self.session.exec(sttmt)).first()
 
             if case is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Caso no encontrado"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
@@ -408,7 +417,7 @@ class CaseService:
             case_exist: UserCase | None = (await self.session.exec(sttmt_exist)).first()
 
             if case_exist is not None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Caso ya compartido"},
                     status_code=status.HTTP_400_BAD_REQUEST
                 )
@@ -423,10 +432,13 @@ class CaseService:
 
             logging.info("Caso compartido con exito")
             
-            return JSONResponse(
+            return ORJSONResponse(
                 content= {"detail": "Caso compartido"},
                 status_code=status.HTTP_200_OK
             )
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             logging.error(f"Error al compartir caso: {e}")
             raise HTTPException(
@@ -446,7 +458,7 @@ class CaseService:
             case: Case | None = (await self.session.exec(sttmt)).first()
 
             if case is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Caso no encontrado"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
@@ -460,7 +472,7 @@ class CaseService:
             case_exist: UserCase | None = (await self.session.exec(sttmt_exist)).first()
 
             if case_exist is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Caso no compartido"},
                     status_code=status.HTTP_400_BAD_REQUEST
                 )
@@ -471,10 +483,13 @@ class CaseService:
 
             logging.info("Caso compartido eliminado con exito")
             
-            return JSONResponse(
+            return ORJSONResponse(
                 content= {"detail": "Caso compartido eliminado"},
                 status_code=status.HTTP_200_OK
             )
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             logging.error(f"Error al eliminar caso compartido: {e}")
             raise HTTPException(
@@ -495,7 +510,7 @@ class CaseService:
             case: Case | None = (await self.session.exec(sttmt)).first()
 
             if case is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Caso no encontrado"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
@@ -512,10 +527,13 @@ class CaseService:
 
             logging.info("Caso eliminado con exito")
             
-            return JSONResponse(
+            return ORJSONResponse(
                 content= {"detail": "Caso eliminado"},
                 status_code=status.HTTP_200_OK
             )
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             logging.error(f"Error al eliminar caso: {e}")
             raise HTTPException(
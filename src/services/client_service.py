@@ -3,11 +3,13 @@ import json
 import logging
 import asyncio
 from fastapi import HTTPException, status
+from src.config.serialization import list_response
 from src.config.timezone import get_timezone
+from src.database.counters import counters
 from src.models.appointment import Appointment, StateAppointment
 from sqlmodel import between, or_, select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from src.models.audit import Audit
 from src.models.client import Client
 from src.models.user_model import User
@@ -45,14 +47,19 @@ class ClientService:
 
             await self.session.commit()
 
+            counters.incr('audits')
+
             logging.info("Cliente creado!")
 
-            return JSONResponse(
+            return ORJSONResponse(
                 content={
                     "client_id": new_client.id
                     },
                 status_code=status.HTTP_201_CREATED
             )
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             logging.error(f"Error al crear cliente: {e}")
             await self.session.rollback()
@@ -65,16 +72,9 @@ class ClientService:
            
             clients: list[Client] = (await self.session.exec(sttmt)).all()
 
-            list_clients: list[ClientResponse] = [
-                ClientResponse.model_validate(client).model_dump(mode='json')
-                for client in clients
-            ]
             logging.info("Clientes obtenidos")
 
-            return JSONResponse(
-                content= list_clients,
-                status_code=status.HTTP_200_OK
-            )
+            return list_response(ClientResponse, clients)
         except Exception as e:
             logging.error(f"Error al obtener Clientes: {e}")
             raise HTTPException(
@@ -89,12 +89,12 @@ class ClientService:
             client: Client | None = (await self.session.exec(sttmt)).first()
 
             if client is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Cliente no encontrado"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
             
-            return JSONResponse(
+            return ORJSONResponse(
                 content=ClientResponse.model_validate(client).model_dump(mode='json'),
                 status_code=status.HTTP_200_OK
             )
@@ -111,17 +111,9 @@ class ClientService:
             sttmt = select(Client).where(Client.dni.like(f"%{dni}%"))
             clients: list[Client] = (await self.session.exec(sttmt)).all()
 
-            list_clients: list[ClientResponse] = [
-                ClientResponse.model_validate(client).model_dump(mode='json')
-                for client in clients
-            ]
-
             logging.info("Clientes obtenidos con exito")
             
-            return JSONResponse(
-                content=list_clients,
-                status_code=status.HTTP_200_OK
-            )
+            return list_response(ClientResponse, clients)
         except Exception as e:
             logging.error(f"Error al obtener clientes: {e}")
             raise HTTPException(
@@ -140,17 +132,9 @@ class ClientService:
             )
             clients: list[Client] = (await self.session.exec(sttmt)).all()
 
-            list_clients: list[ClientResponse] = [
-                ClientResponse.model_validate(client).model_dump(mode='json')
-                for client in clients
-            ]
-
             logging.info("Clientes obtenidos con exito")
             
-            return JSONResponse(
-                content=list_clients,
-                status_code=status.HTTP_200_OK
-            )
+            return list_response(ClientResponse, clients)
         except Exception as e:
             logging.error(f"Error al obtener clientes: {e}")
             raise HTTPException(
@@ -165,7 +149,7 @@ class ClientService:
             client: Client | None = (await self.session.exec(sttmt)).first()
 
             if client is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Cliente no encontrado"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
@@ -187,13 +171,18 @@ class ClientService:
 
             await self.session.commit()
 
+            counters.incr('audits')
+
             logging.info("Cliente actualizado")
 
 
-            return JSONResponse(
+            return ORJSONResponse(
                 content= {'detail': 'Cliente editado con exito!'},
                 status_code=status.HTTP_200_OK
             )
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             logging.error(f"Error al editar Cliente: {e}")
             await self.session.rollback()
@@ -1,9 +1,341 @@
+import asyncio
+import hashlib
 import logging
-import uuid, os
-from fastapi import HTTPException, UploadFile, status
-from fastapi.responses import FileResponse, JSONResponse
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
+from cachetools import LRUCache
+from decouple import config
+from fastapi import HTTPException, Request, Response, UploadFile, status
+from fastapi.responses import FileResponse, ORJSONResponse
 import cv2
 import numpy as np
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config.etag import etag_matches, make_etag
+from src.config.images import MAX_DIMENSION, RESIZE_WIDTHS, VARIANT_WIDTHS, original_name, variant_name
+from src.models.image_reference import ImageReference
+
+
+def alternate_formats() -> list[tuple[str, str, list[int]]]:
+    """
+    Formatos que se guardan ademas del JPEG/PNG, en orden de preferencia.
+    Solo se incluyen los que el build de OpenCV puede codificar.
+    """
+    formats = []
+    if hasattr(cv2, 'IMWRITE_AVIF_QUALITY') and cv2.haveImageWriter('.avif'):
+        formats.append(('image/avif', '.avif', [cv2.IMWRITE_AVIF_QUALITY, 60]))
+    if cv2.haveImageWriter('.webp'):
+        formats.append(('image/webp', '.webp', [cv2.IMWRITE_WEBP_QUALITY, 80]))
+    return formats
+
+ALTERNATE_FORMATS = alternate_formats()
+
+def with_extension(filename: str, extension: str) -> str:
+    return f"{os.path.splitext(filename)[0]}{extension}"
+
+def accepted_types(accept: str | None) -> set[str]:
+    """
+    Tipos del header Accept con q > 0. Los comodines no se expanden:
+    solo se negocia un formato alternativo si el cliente lo pide explicitamente.
+    """
+    types = set()
+    for media_range in (accept or '').split(','):
+        media_type, *params = [part.strip() for part in media_range.split(';')]
+        quality = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if media_type and quality > 0:
+            types.add(media_type.lower())
+    return types
+
+def resize_image(image: np.ndarray, max_dimension: int = MAX_DIMENSION) -> np.ndarray:
+    h, w = image.shape[:2]
+    if max(h, w) > max_dimension:
+        scaling_factor = max_dimension / float(max(h, w))
+        new_h, new_w = int(h * scaling_factor), int(w * scaling_factor)
+        image_resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_AREA)
+        return image_resized
+    return image
+
+def resize_to_width(image: np.ndarray, width: int) -> np.ndarray:
+    h, w = image.shape[:2]
+    if w > width:
+        new_h = max(1, round(h * width / float(w)))
+        return cv2.resize(image, (width, new_h), interpolation=cv2.INTER_AREA)
+    return image
+
+def process_image(image_data: bytes, file_location: str, file_extension: str) -> bool:
+    """
+    Decodifica, redimensiona y guarda la imagen junto con sus variantes.
+    Es bloqueante, se ejecuta en el ImagePool.
+    """
+    image_array = np.frombuffer(image_data, dtype=np.uint8)
+    image = cv2.imdecode(image_array, cv2.IMREAD_COLOR)
+
+    if image is None:
+        return False
+
+    image_resized = resize_image(image)
+
+    params = encode_params(file_extension)
+
+    # La imagen principal se escribe al final: si existe, sus variantes tambien
+    for width in VARIANT_WIDTHS:
+        if not write_formats(variant_name(file_location, width), resize_to_width(image_resized, width), params):
+            return False
+    return write_formats(file_location, image_resized, params)
+
+def encode_params(file_extension: str) -> list[int]:
+    for _, extension, params in ALTERNATE_FORMATS:
+        if extension == file_extension:
+            return params
+    if file_extension == '.jpg':
+        return [cv2.IMWRITE_JPEG_QUALITY, 85]
+    return [cv2.IMWRITE_PNG_COMPRESSION, 9]
+
+def resize_file(source_path: str, target_path: str, width: int) -> bool:
+    """
+    Redimensiona una imagen guardada al ancho pedido. Se escribe en un archivo
+    temporal y se renombra, para no servir nunca una imagen a medio escribir.
+    """
+    image = cv2.imread(source_path, cv2.IMREAD_COLOR)
+    if image is None:
+        return False
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    extension = os.path.splitext(target_path)[1]
+    temp_path = f"{os.path.splitext(target_path)[0]}.{uuid.uuid4().hex}.tmp{extension}"
+    if not cv2.imwrite(temp_path, resize_to_width(image, width), encode_params(extension)):
+        return False
+    os.replace(temp_path, target_path)
+    return True
+
+def write_formats(file_location: str, image: np.ndarray, params: list[int]) -> bool:
+    if not cv2.imwrite(file_location, image, params):
+        return False
+    for _, extension, alternate_params in ALTERNATE_FORMATS:
+        if not cv2.imwrite(with_extension(file_location, extension), image, alternate_params):
+            return False
+    return True
+
+
+class ImagePool:
+    """
+    Pool de hilos acotado para el trabajo de OpenCV, que libera el GIL
+    mientras decodifica, redimensiona y codifica.
+    Si hay demasiadas imagenes en espera responde 503 en lugar de encolar.
+    """
+    def __init__(self, workers: int, max_pending: int, timeout: float) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(workers)
+        self._pending = 0
+
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='image')
+            logging.info('Pool de imagenes iniciado')
+
+    def stop(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            logging.info('Pool de imagenes detenido')
+
+    async def run(self, func, *args):
+        if self._pending >= self.workers + self.max_pending:
+            logging.warning('Pool de imagenes lleno')
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="El servidor está ocupado, intente nuevamente"
+            )
+        self.start()
+        self._pending += 1
+        try:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.timeout)
+            except asyncio.TimeoutError:
+                logging.warning('Tiempo de espera agotado en el pool de imagenes')
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="El servidor está ocupado, intente nuevamente"
+                )
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+            finally:
+                self._slots.release()
+        finally:
+            self._pending -= 1
+
+    def pending(self) -> int:
+        return self._pending
+
+
+class HotImageCache:
+    """
+    LRU en memoria, acotado en bytes, de las imagenes mas pedidas
+    (avatares, imagenes de la portada). Las imagenes grandes se sirven desde disco.
+    """
+    def __init__(self, max_bytes: int, max_item_bytes: int) -> None:
+        self.max_item_bytes = min(max_bytes, max_item_bytes)
+        self.cache: LRUCache = LRUCache(maxsize=max(max_bytes, 1), getsizeof=len)
+
+    async def read(self, file_path: str, stat: os.stat_result) -> bytes | None:
+        key = (file_path, stat.st_mtime_ns)
+        body = self.cache.get(key)
+        if body is None and 0 < stat.st_size <= self.max_item_bytes:
+            body = await asyncio.to_thread(read_file, file_path)
+            self.cache[key] = body
+        return body
+
+    def discard(self, file_path: str) -> None:
+        for key in [key for key in self.cache if key[0] == file_path]:
+            self.cache.pop(key, None)
+
+
+class ResizeCache:
+    """
+    Cache en disco de las imagenes redimensionadas a pedido, acotada en bytes
+    con desalojo LRU. El orden de uso se guarda en el atime de cada archivo
+    para conservarlo entre reinicios; el mtime no se toca porque arma el ETag.
+    El indice vive en memoria y el acceso al disco corre en un hilo aparte.
+    """
+    def __init__(self, path: str, max_bytes: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, int] | None = None
+        self._size = 0
+        self._loading = asyncio.Lock()
+
+    async def load(self) -> None:
+        # Se llama al iniciar la app; si no, el primer uso arma el indice
+        async with self._loading:
+            if self._entries is None:
+                entries = await asyncio.to_thread(scan_files, self.path)
+                self._entries = entries
+                self._size = sum(entries.values())
+
+    async def _load(self) -> OrderedDict[str, int]:
+        if self._entries is None:
+            await self.load()
+        return self._entries
+
+    async def touch(self, file_path: str) -> None:
+        entries = await self._load()
+        if file_path in entries:
+            entries.move_to_end(file_path)
+            await asyncio.to_thread(touch_atime, file_path)
+
+    async def add(self, file_path: str) -> None:
+        size = await asyncio.to_thread(os.path.getsize, file_path)
+        entries = await self._load()
+        self._size -= entries.pop(file_path, 0)
+        entries[file_path] = size
+        self._size += size
+        evicted = []
+        while self._size > self.max_bytes and len(entries) > 1:
+            evicted_path, evicted_size = entries.popitem(last=False)
+            self._size -= evicted_size
+            evicted.append(evicted_path)
+        await self._remove(evicted)
+
+    async def discard(self, prefix: str) -> None:
+        entries = await self._load()
+        removed = [file_path for file_path in entries if file_path.startswith(prefix)]
+        for file_path in removed:
+            self._size -= entries.pop(file_path)
+        await self._remove(removed)
+
+    async def _remove(self, file_paths: list[str]) -> None:
+        # El indice ya se actualizo, el borrado del disco puede terminar despues
+        if not file_paths:
+            return
+        for file_path in file_paths:
+            hot_images.discard(file_path)
+        await asyncio.to_thread(remove_files, file_paths)
+
+    def stats(self) -> dict:
+        files = len(self._entries) if self._entries is not None else None
+        return {"files": files, "size": self._size, "max_size": self.max_bytes}
+
+
+def scan_files(path: str) -> OrderedDict[str, int]:
+    """
+    Recorre la cache en disco y devuelve {ruta: bytes} ordenado por atime, del
+    menos al mas usado recientemente.
+    """
+    files = []
+    for root, _, names in os.walk(path):
+        for name in names:
+            file_path = os.path.join(root, name)
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_atime, file_path, stat.st_size))
+    return OrderedDict((file_path, size) for _, file_path, size in sorted(files))
+
+def touch_atime(file_path: str) -> None:
+    try:
+        os.utime(file_path, ns=(time.time_ns(), os.stat(file_path).st_mtime_ns))
+    except FileNotFoundError:
+        pass
+
+
+def find_orphans(path_image: str, referenced: set[str], older_than: float) -> list[tuple[str, str, int]]:
+    """
+    Archivos de la carpeta cuya imagen original no esta referenciada
+    y que no se modificaron despues de older_than.
+    """
+    orphans = []
+    for entry in os.scandir(path_image):
+        if not entry.is_file():
+            continue
+        name = os.path.splitext(original_name(entry.name))[0]
+        stat = entry.stat()
+        if name not in referenced and stat.st_mtime < older_than:
+            orphans.append((entry.path, name, stat.st_size))
+    return orphans
+
+def paths_exist(*file_paths: str) -> tuple[bool, ...]:
+    return tuple(os.path.exists(file_path) for file_path in file_paths)
+
+def remove_files(file_paths: list[str]) -> None:
+    for file_path in file_paths:
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+
+def read_file(file_path: str) -> bytes:
+    with open(file_path, 'rb') as file:
+        return file.read()
+
+
+image_pool = ImagePool(
+    workers=config('IMAGE_POOL_WORKERS', default=2, cast=int),
+    max_pending=config('IMAGE_POOL_QUEUE_SIZE', default=8, cast=int),
+    timeout=config('IMAGE_POOL_TIMEOUT', default=30, cast=float),
+)
+
+hot_images = HotImageCache(
+    max_bytes=config('IMAGE_CACHE_BYTES', default=32 * 1024 * 1024, cast=int),
+    max_item_bytes=config('IMAGE_CACHE_MAX_ITEM_BYTES', default=512 * 1024, cast=int),
+)
+
+resize_cache = ResizeCache(
+    path=config('IMAGE_RESIZE_CACHE_DIR', default=os.path.join('src', 'images', 'cache')),
+    max_bytes=config('IMAGE_RESIZE_CACHE_BYTES', default=64 * 1024 * 1024, cast=int),
+)
 
 
 class ImageTool:
@@ -16,73 +348,158 @@ class ImageTool:
         "image/jpeg": ".jpg",
         "image/png": ".png",
     }
+    # Se identifica el formato por los primeros bytes, no por el content_type del cliente
+    magic_numbers = {
+        b"\xff\xd8\xff": "image/jpeg",
+        b"\x89PNG\r\n\x1a\n": "image/png",
+    }
+    CHUNK_SIZE = 64 * 1024
+    extension_to_mime = {
+        ".jpg": "image/jpeg",
+        ".jpeg": "image/jpeg",
+        ".png": "image/png",
+        ".webp": "image/webp",
+        ".avif": "image/avif",
+    }
+    # Los nombres son hashes del contenido: una url nunca cambia de contenido
+    IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+    # Variante que todavia no existe y se responde con la original
+    FALLBACK_CACHE_CONTROL = "public, max-age=86400"
 
     def __init__(self, path_image: str) -> None:
         self.path_image = path_image
         os.makedirs(self.path_image, exist_ok=True)
 
-    async def reset_name_image(self, filename: str) -> str:
-        name, extension = os.path.splitext(filename)
-        new_name = f"{uuid.uuid4()}{extension}"
-        return new_name
+    @property
+    def folder(self) -> str:
+        return os.path.basename(self.path_image)
 
-    async def save_image(self, image_file: UploadFile) -> str | None:
-        if 'image' not in image_file.content_type:
-            raise JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Formato de imagen no soportado. Los formatos válidos son: JPEG, PNG"
-            )
-        try:
-            logging.info("Guardando imagen")
+    def content_name(self, image_data: bytes, file_extension: str) -> str:
+        """
+        Nombre derivado del contenido: la misma imagen subida dos veces comparte archivo.
+        """
+        return f"{hashlib.blake2b(image_data, digest_size=16).hexdigest()}{file_extension}"
 
-            file_size = len(image_file.file.read())
-            image_file.file.seek(0)
+    def sniff_mime_type(self, header: bytes) -> str | None:
+        for magic, mime_type in self.magic_numbers.items():
+            if header.startswith(magic):
+                return mime_type
+        return None
 
-            if file_size > self.MAX_FILE_SIZE:
-                raise JSONResponse(
-                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                    detail="La imagen no puede exceder los 2MB"
-                )
+    async def read_image(self, image_file: UploadFile) -> tuple[bytes, str] | None:
+        """
+        Lee la imagen por bloques, cortando apenas supera MAX_FILE_SIZE
+        o si los primeros bytes no corresponden a un formato soportado.
+        """
+        if image_file.size is not None and image_file.size > self.MAX_FILE_SIZE:
+            logging.error("La imagen no puede exceder los 2MB")
+            return None
 
-            file_extension = self.mime_to_extension[image_file.content_type]
-            filename = await self.reset_name_image(f"{uuid.uuid4().hex}{file_extension}")
-            file_location = os.path.join(self.path_image, filename)
+        image_data = bytearray(await image_file.read(self.CHUNK_SIZE))
+        mime_type = self.sniff_mime_type(image_data)
+        if mime_type not in self.ALLOWED_MIME_TYPES:
+            logging.error("Formato de imagen no soportado. Los formatos válidos son: JPEG, PNG")
+            return None
+
+        while chunk := await image_file.read(self.CHUNK_SIZE):
+            image_data += chunk
+            if len(image_data) > self.MAX_FILE_SIZE:
+                logging.error("La imagen no puede exceder los 2MB")
+                return None
 
-            image_data = await image_file.read()
-            print(f"Tipo de image_data: {type(image_data)}, Tamaño: {len(image_data)} bytes")
+        return bytes(image_data), mime_type
 
-            image_array = np.frombuffer(image_data, dtype=np.uint8)
-            image = cv2.imdecode(image_array, cv2.IMREAD_COLOR)
+    async def save_image(self, image_file: UploadFile) -> str | None:
+        try:
+            logging.info("Guardando imagen")
 
+            image = await self.read_image(image_file)
             if image is None:
-                raise JSONResponse(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="El archivo no es una imagen válida"
-                )
+                return None
 
-            image_resized = await self.resize_image(image)
+            image_data, mime_type = image
+            file_extension = self.mime_to_extension[mime_type]
+            filename = self.content_name(image_data, file_extension)
+            file_location = os.path.join(self.path_image, filename)
+
+            if os.path.exists(file_location):
+                logging.info("Imagen ya almacenada")
+                return filename
 
-            if file_extension == '.jpg':
-                cv2.imwrite(file_location, image_resized, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            elif file_extension == '.png':
-                cv2.imwrite(file_location, image_resized, [cv2.IMWRITE_PNG_COMPRESSION, 9])
+            if not await image_pool.run(process_image, image_data, file_location, file_extension):
+                logging.error("El archivo no es una imagen válida")
+                return None
 
             logging.info("Imagen guardada")
             return filename
+        except HTTPException:
+            raise
         except Exception as e:
             logging.error(f"Error al guardar imagen: {e}")
             return None
 
-    async def resize_image(self, image: np.ndarray) -> np.ndarray:
-        max_dimension = 1024
-        h, w = image.shape[:2]
-        if max(h, w) > max_dimension:
-            scaling_factor = max_dimension / float(max(h, w))
-            new_h, new_w = int(h * scaling_factor), int(w * scaling_factor)
-            image_resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_AREA)
-            return image_resized
-        return image
-    
+    async def add_reference(self, session: AsyncSession, filename: str) -> None:
+        reference = await session.get(ImageReference, (self.folder, filename))
+        # La imagen se guarda fuera del turno de escritura: otra solicitud pudo
+        # borrarla por no tener referencias antes de que se tomara el turno
+        if not os.path.exists(os.path.join(self.path_image, filename)):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="La imagen se eliminó mientras se subía, intente nuevamente"
+            )
+        if reference is None:
+            session.add(ImageReference(folder=self.folder, filename=filename, refs=1))
+        else:
+            reference.refs += 1
+
+    async def release_reference(self, session: AsyncSession, filename: str) -> None:
+        reference = await session.get(ImageReference, (self.folder, filename))
+        if reference is None:
+            return
+        reference.refs -= 1
+        if reference.refs <= 0:
+            await session.delete(reference)
+
+    async def delete_if_unreferenced(self, session: AsyncSession, filename: str) -> bool:
+        """
+        Elimina los archivos de la imagen si ya no la referencia ningun registro.
+        Debe llamarse despues del commit que libero la referencia. Los archivos se
+        borran con el turno de escritura y al final se cierra la transaccion para liberarlo.
+        """
+        try:
+            if await session.get(ImageReference, (self.folder, filename)) is not None:
+                return False
+            await self.delete_image(filename)
+            return True
+        finally:
+            await session.commit()
+
+    async def sweep_orphans(self, session: AsyncSession, referenced: set[str], grace_seconds: float) -> tuple[int, int]:
+        """
+        Elimina las imagenes que no referencia ningun registro, con sus variantes,
+        si tienen mas de grace_seconds (una subida en curso todavia no hizo commit).
+        Devuelve la cantidad de archivos eliminados y los bytes liberados.
+        """
+        referenced_names = {os.path.splitext(filename)[0] for filename in referenced}
+        orphans = await asyncio.to_thread(find_orphans, self.path_image, referenced_names, time.time() - grace_seconds)
+        if not orphans:
+            return 0, 0
+
+        await asyncio.to_thread(remove_files, [file_path for file_path, _, _ in orphans])
+
+        orphan_names = {name for _, name, _ in orphans}
+        for file_path, _, _ in orphans:
+            hot_images.discard(file_path)
+        for name in orphan_names:
+            await resize_cache.discard(os.path.join(resize_cache.path, self.folder, f"{name}_w"))
+
+        references = (await session.exec(select(ImageReference).where(ImageReference.folder == self.folder))).all()
+        for reference in references:
+            if os.path.splitext(reference.filename)[0] in orphan_names:
+                await session.delete(reference)
+
+        return len(orphans), sum(size for _, _, size in orphans)
+
     async def delete_image(self, filename: str) -> None:
         try:
             media_path = os.path.join(self.path_image, filename)
@@ -90,27 +507,122 @@ class ImageTool:
                 os.remove(media_path)
             else:
                 logging.info("Imagen no encontrada, para eliminar")
+            for path in [media_path, *(variant_name(media_path, width) for width in VARIANT_WIDTHS)]:
+                for related_path in [path, *(with_extension(path, extension) for _, extension, _ in ALTERNATE_FORMATS)]:
+                    hot_images.discard(related_path)
+                    if os.path.exists(related_path):
+                        os.remove(related_path)
+            name = os.path.splitext(filename)[0]
+            await resize_cache.discard(os.path.join(resize_cache.path, self.folder, f"{name}_w"))
         except Exception as e:
             logging.error(f"Error al eliminar imagen: {e}")
             
         
-    async def get_image(self, file_name: str):
+    async def get_image(self, request: Request, file_name: str):
         try:
             logging.info("Obteniendo imagen")
             file_path = os.path.join(self.path_image, file_name)
+            cache_control = self.IMMUTABLE_CACHE_CONTROL
 
             if not os.path.exists(file_path):
-                return JSONResponse(status_code=404, content={"detail": "Imagen no encontrada"})
+                # Imagenes subidas antes de generar variantes: se sirve la original
+                file_path = os.path.join(self.path_image, original_name(file_name))
+                cache_control = self.FALLBACK_CACHE_CONTROL
+
+            if not os.path.exists(file_path):
+                return ORJSONResponse(status_code=404, content={"detail": "Imagen no encontrada"})
 
             file_extension = os.path.splitext(file_name)[1].lower()
-            mime_type = self.mime_to_extension.get(file_extension, "application/octet-stream")
+            mime_type = self.extension_to_mime.get(file_extension, "application/octet-stream")
 
-            logging.info("Imagen obtenida")
+            accepted = accepted_types(request.headers.get('accept'))
+            for alternate_mime, extension, _ in ALTERNATE_FORMATS:
+                alternate_path = with_extension(file_path, extension)
+                if alternate_mime in accepted and os.path.exists(alternate_path):
+                    file_path, mime_type = alternate_path, alternate_mime
+                    break
 
-            return FileResponse(file_path, media_type=mime_type, filename=file_name, status_code= status.HTTP_200_OK)
+            return await self.serve_file(request, file_path, mime_type, cache_control)
         except Exception as e:
             logging.error(f"Error al obtener imagen: {e}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Error al intentar obtener la imagen"
-            )
\ No newline at end of file
+            )
+
+    def resize_path(self, file_name: str, width: int, extension: str) -> str:
+        name = os.path.splitext(file_name)[0]
+        return os.path.join(resize_cache.path, self.folder, f"{name}_w{width}{extension}")
+
+    async def get_resized_image(self, request: Request, file_name: str, width: int):
+        if width not in RESIZE_WIDTHS:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Ancho no permitido. Los anchos válidos son: {', '.join(map(str, RESIZE_WIDTHS))}"
+            )
+        try:
+            logging.info("Obteniendo imagen redimensionada")
+            source_path = os.path.join(self.path_image, original_name(file_name))
+
+            extension = os.path.splitext(source_path)[1].lower()
+            accepted = accepted_types(request.headers.get('accept'))
+            for alternate_mime, alternate_extension, _ in ALTERNATE_FORMATS:
+                if alternate_mime in accepted:
+                    extension = alternate_extension
+                    break
+
+            target_path = self.resize_path(os.path.basename(source_path), width, extension)
+            source_exists, target_exists = await asyncio.to_thread(paths_exist, source_path, target_path)
+
+            if not source_exists:
+                return ORJSONResponse(status_code=404, content={"detail": "Imagen no encontrada"})
+
+            if target_exists:
+                await resize_cache.touch(target_path)
+            else:
+                if not await image_pool.run(resize_file, source_path, target_path, width):
+                    raise ValueError(f"No se pudo redimensionar {source_path}")
+                await resize_cache.add(target_path)
+
+            mime_type = self.extension_to_mime.get(extension, "application/octet-stream")
+            return await self.serve_file(request, target_path, mime_type, self.IMMUTABLE_CACHE_CONTROL)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logging.error(f"Error al obtener imagen redimensionada: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error al intentar obtener la imagen"
+            )
+
+    async def serve_file(self, request: Request, file_path: str, mime_type: str, cache_control: str) -> Response:
+        stat = os.stat(file_path)
+        etag = make_etag(os.path.basename(file_path), stat.st_size, stat.st_mtime_ns)
+        headers = {
+            'Cache-Control': cache_control,
+            'ETag': etag,
+            'Last-Modified': formatdate(stat.st_mtime, usegmt=True),
+            'Vary': 'Accept',
+        }
+
+        if etag_matches(request, etag) or self.not_modified_since(request, stat.st_mtime):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        logging.info("Imagen obtenida")
+
+        body = await hot_images.read(file_path, stat)
+        if body is not None:
+            return Response(content=body, media_type=mime_type, headers=headers, status_code=status.HTTP_200_OK)
+
+        return FileResponse(file_path, media_type=mime_type, headers=headers, stat_result=stat, status_code= status.HTTP_200_OK)
+
+    @staticmethod
+    def not_modified_since(request: Request, mtime: float) -> bool:
+        # If-None-Match tiene prioridad sobre If-Modified-Since
+        if_modified_since = request.headers.get('if-modified-since')
+        if not if_modified_since or 'if-none-match' in request.headers:
+            return False
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
@@ -3,17 +3,21 @@ import logging
 import os
 import bcrypt
 from fastapi import HTTPException, Request, UploadFile, status
+from src.config.etag import bytes_with_etag
+from src.config.serialization import json_bytes_response, list_body
 from src.config.timezone import get_timezone
+from src.config.urls import base_url
 from src.models.refresh_token import HistorialRefreshToken
 from src.models.user_model import RoleUser, User
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from src.schemas.user_schema.user_create import UserCreate
 from src.schemas.user_schema.user_credentials import UserCredentials
 from src.schemas.user_schema.user_response import UserResponse
 from src.schemas.user_schema.user_update import UserUpdate
 from src.services.auth_service import AuthService
+from src.services.cache_service import blog_cache
 from src.services.image_service import ImageTool
 
 class UserService:
@@ -25,15 +29,17 @@ class UserService:
             logging.info("Logueando usuario")
             statement = select(User).where(User.email == credentials.email)
             user: User | None = (await self.session.exec(statement)).first()
+            # Cierra la lectura antes de bcrypt, que es lento, para liberar el turno de escritura
+            await self.session.commit()
 
             if user is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Credenciales incorrectas"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
             
             if self.verify_password(credentials.password, user.password_hash) == False:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Credenciales incorrectas"},
                     status_code=status.HTTP_404_NOT_FOUND
                 )
@@ -50,11 +56,14 @@ class UserService:
 
             logging.info("Login exitoso")
 
-            return JSONResponse(
+            return ORJSONResponse(
                 content=token,
                 status_code=status.HTTP_200_OK
             )
 
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             logging.error("Error login: {e}")
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Error al intentar loguear")
@@ -69,7 +78,7 @@ class UserService:
             token: HistorialRefreshToken | None = (await self.session.exec(statement)).first()
 
             if token is None:
-                return JSONResponse(
+                return ORJSONResponse(
                     content={"detail": "Credenciales incorrectas"},
                     status_code=status.HTTP_400_BAD_REQUEST
                 )
@@ -77,44 +86,51 @@ class UserService:
             await self.session.delete(token)
             await self.session.commit()
 
-            return JSONResponse(
+            return ORJSONResponse(
                 content={"detail": "Logout exitoso"},
                 status_code=status.HTTP_204_NO_CONTENT
             )
 
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Error al intentar logout")
 
     
     async def create_user(self, user: UserCreate, image: UploadFile, is_admin: bool = False):
+            image_tool = ImageTool(os.path.join('src', 'images', 'user'))
+            new_image = None
             try:
                 logging.info("Creando usuario")
+                # La imagen se procesa antes de la primera consulta para no retener el turno de escritura
+                new_image = await image_tool.save_image(image)
+
+                if new_image is None:
+                    return ORJSONResponse(
+                        content={
+                            "detail": "Error al guardar la imagen"
+                            },
+                        status_code=status.HTTP_424_FAILED_DEPENDENCY
+                    )
+
                 statement= select(User).where(User.email == user.email)
                                             
                 result = await self.session.exec(statement)
                 user_exist: User | None = result.first()
                 
                 if(user_exist != None):
+                    await image_tool.delete_if_unreferenced(self.session, new_image)
                     if user_exist.username == user.username:
-                        return JSONResponse(
+                        return ORJSONResponse(
                             status_code=status.HTTP_409_CONFLICT, 
                             content={"detail": "El username ya se encuentra en uso"}
                             )
                     if user_exist.email == user.email:
-                        return JSONResponse(
+                        return ORJSONResponse(
                             status_code=status.HTTP_409_CONFLICT, 
                             content={"detail": "El email ya existe."}
                             )
-                 
-                new_image = await ImageTool(os.path.join('src', 'images', 'user')).save_image(image)
-
-                if new_image is None:
-                    return JSONResponse(
-                        content={
-                            "detail": "Error al guardar la imagen"
-                            },
-                        status_code=status.HTTP_424_FAILED_DEPENDENCY
-                    )
             
                 new_user: User = User(**user.model_dump(), url_image= new_image)
 
@@ -122,57 +138,84 @@ class UserService:
                     new_user.role = RoleUser.ADMIN
 
                 self.session.add(new_user)
+                await image_tool.add_reference(self.session, new_image)
 
                 await self.session.commit()
                 logging.info("usuario creado")
 
-                return JSONResponse(
+                return ORJSONResponse(
                             status_code=status.HTTP_201_CREATED, 
                             content={"detail": "Usuario creado exitosamente."}
                             )
+            except HTTPException:
+                await self.session.rollback()
+                if new_image:
+                    await image_tool.delete_if_unreferenced(self.session, new_image)
+                raise
             except Exception as e:
                 logging.error(f"Error al crear usuario: {e}")
-                if new_image:
-                    ImageTool(os.path.join('src', 'images', 'user')).delete_image(new_image)
                 await self.session.rollback()
+                if new_image:
+                    await image_tool.delete_if_unreferenced(self.session, new_image)
                 raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, 'Error al crear usuario.')
             
     async def update_user(self, user_update: UserUpdate, user: User, image: UploadFile | None):
+            image_tool = ImageTool(os.path.join('src', 'images', 'user'))
+            file_name = None
             try:
+                # La imagen se procesa antes de la primera consulta para no retener el turno de escritura
+                if image is not None:
+                    file_name = await image_tool.save_image(image)
+
+                    if file_name is None:
+                        raise HTTPException(
+                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="Error al intentar editar el usuario"
+                        )
+
                 user_exist: User | None = await self.session.get(User, user.id)
                 
                 if(user_exist == None):
-                    return JSONResponse(
-                            status_code=status.HTTP_404_NOT_FOUND, 
-                            content={"detail": "Usuario no encontrado"}
-                            )
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Usuario no encontrado"
+                    )
 
                 user_exist.username = user_update.username 
                 user_exist.first_name = user_update.first_name 
                 user_exist.last_name = user_update.last_name
                 user_exist.specialty = user_update.specialty
+                user_exist.updated_at = get_timezone()
 
-                if image is not None:
-                    image_tool = ImageTool(os.path.join('src', 'images', 'user'))
-                    file_name = await image_tool.save_image(image)
-
-                    if file_name is None:
-                        raise HTTPException(
-                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail="Error al intentar editar el usuario"
-                        )
-                    
-                    await image_tool.delete_image(user_exist.url_image)
+                old_image = None
+                if file_name is not None:
+                    old_image = user_exist.url_image
+                    await image_tool.add_reference(self.session, file_name)
+                    await image_tool.release_reference(self.session, old_image)
 
                     user_exist.url_image = file_name
 
                 await self.session.commit()
 
-                return JSONResponse(
+                if old_image is not None:
+                    await image_tool.delete_if_unreferenced(self.session, old_image)
+
+                # Los listados de blogs incluyen nombre y avatar del autor
+                blog_cache.clear()
+
+                return ORJSONResponse(
                             status_code=status.HTTP_201_CREATED, 
                             content={"detail": "Usuario editado exitosamente."}
                             )
+            except HTTPException:
+                await self.session.rollback()
+                if file_name:
+                    await image_tool.delete_if_unreferenced(self.session, file_name)
+                raise
             except Exception as e:
+                await self.session.rollback()
+                if file_name:
+                    await image_tool.delete_if_unreferenced(self.session, file_name)
                 raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, 'Error al editar usuario.')
             
     async def get_users(self, request: Request):
@@ -182,20 +225,12 @@ class UserService:
             users = await self.session.exec(statement)
             users = users.all()
 
-            scheme = request.scope.get("scheme") 
-            host = request.headers.get("host")   
-            full_url = f"{scheme}://{host}/image/get_image_user/"
+            full_url = f"{base_url(request)}/image/get_image_user/"
 
-            users_list = []
             for user in users:
                 user.url_image = full_url + user.url_image
-                u = UserResponse.model_validate(user).model_dump(mode='json')
-                users_list.append(u)
 
-            return JSONResponse(
-                status_code=status.HTTP_200_OK, 
-                content=users_list
-            )
+            return bytes_with_etag(request, json_bytes_response(list_body(UserResponse, users)))
         except Exception as e:
             logging.error(f"Error al obteniendo usuarios: {e}")
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, 'Error al obtener usuarios.')
@@ -210,7 +245,7 @@ class UserService:
             historial_rt: HistorialRefreshToken | None = (await self.session.exec(statement)).first()
 
             if not historial_rt:
-                return JSONResponse(
+                return ORJSONResponse(
                     status_code=status.HTTP_401_UNAUTHORIZED, 
                     content={'detail':'Credenciales no encontradas'}
                 )
@@ -221,7 +256,7 @@ class UserService:
                 await self.session.delete(historial_rt)
                 await self.session.commit()
 
-                return JSONResponse(
+                return ORJSONResponse(
                     status_code=status.HTTP_401_UNAUTHORIZED, 
                     content={'detail':'Refresh token expirado.'}
                 )
@@ -231,11 +266,15 @@ class UserService:
 
             historial_rt.token = new_token
             historial_rt.refresh_token = new_refresh_token
+            historial_rt.expire = get_timezone() + timedelta(days=7)
 
             await self.session.commit()
 
             return {"token": new_token, "refresh_token": new_refresh_token}
 
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except Exception as e:
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, 'Error al actualizar el token.')
 
@@ -250,7 +289,7 @@ class UserService:
             if isinstance(value, date):
                 user_dict[key] = value.isoformat()
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_200_OK, 
             content=user_dict
         )
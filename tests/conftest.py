@@ -0,0 +1,30 @@
+import os
+import sys
+import tempfile
+import pytest
+
+# La configuracion se lee al importar la app: los tests usan una base y carpetas temporales
+os.environ.setdefault('DB_NAME', 'test')
+os.environ.setdefault('SECRET_KEY', 'test')
+for name in ('SMTP_SERVER', 'EMAIL_PORT', 'EMAIL', 'EMAIL_PASSWORD', 'ID_FOLDER', 'ID_FOLDER_IMAGES'):
+    os.environ.setdefault(name, 'test')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp(prefix='sijac-tests-'))
+
+from src.database.db import db
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+@pytest.fixture
+async def database():
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(f'{db.database_path}{suffix}'):
+            os.remove(f'{db.database_path}{suffix}')
+    await db.connect()
+    await db.create_tables()
+    yield db
+    await db.close()
@@ -0,0 +1,29 @@
+import sqlite3
+from contextlib import closing
+import pytest
+from src.database.backup import snapshot_database, verify_snapshot
+
+
+def make_database(path: str) -> None:
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)')
+        conn.executemany('INSERT INTO notes (body) VALUES (?)', [('x' * 500,) for _ in range(200)])
+        conn.commit()
+
+def test_snapshot_is_verified_from_the_file(tmp_path):
+    make_database(str(tmp_path / 'live.db'))
+    snapshot_database(str(tmp_path / 'live.db'), str(tmp_path / 'snapshot.db'))
+    verify_snapshot(str(tmp_path / 'snapshot.db'))
+    assert not (tmp_path / 'snapshot.db-wal').exists()
+
+def test_corrupted_snapshot_is_rejected(tmp_path):
+    make_database(str(tmp_path / 'live.db'))
+    snapshot_database(str(tmp_path / 'live.db'), str(tmp_path / 'snapshot.db'))
+    with open(tmp_path / 'snapshot.db', 'r+b') as file:
+        # Pisa paginas de datos, dejando intacto el encabezado
+        file.seek(4096 * 2)
+        file.write(b'\xff' * 4096 * 3)
+
+    with pytest.raises(sqlite3.DatabaseError):
+        verify_snapshot(str(tmp_path / 'snapshot.db'))
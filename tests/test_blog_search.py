@@ -0,0 +1,56 @@
+import io
+import os
+import sqlite3
+from contextlib import closing
+import orjson
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from src.models.blog_model import CategoryBlog
+from src.models.user_model import User
+from src.schemas.blog_schemas.blog_create import BlogCreate
+from src.schemas.blog_schemas.blog_update import BlogUpdate
+from src.services.blog_service import BlogService
+
+pytestmark = pytest.mark.anyio
+
+IMAGE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'static', 'image', 'admin_user.png')
+REQUEST = Request({'type': 'http', 'scheme': 'http', 'method': 'GET', 'path': '/', 'query_string': b'', 'headers': [(b'host', b'testserver')]})
+LONG_BODY = 'El contrato de locacion se rige por el codigo civil y comercial. ' * 40
+
+
+def image() -> UploadFile:
+    with open(IMAGE_PATH, 'rb') as file:
+        return UploadFile(io.BytesIO(file.read()), filename='blog.png', headers=Headers({'content-type': 'image/png'}))
+
+async def search(database, q: str) -> list[str]:
+    async with database.async_session() as session:
+        response = await BlogService(session).search(REQUEST, q)
+    return [blog['title'] for blog in orjson.loads(response.body)['data']]
+
+async def test_search_index_follows_blog_writes(database):
+    async with database.async_write_session() as session:
+        session.add(User(id='user', username='abogado', email='abogado@sijac.com', first_name='Nombre', last_name='Apellido', password_hash='-', specialty='Civil', url_image='user.png'))
+        await session.commit()
+        response = await BlogService(session).create(BlogCreate(title='Alquileres', body=LONG_BODY, categories=CategoryBlog.NEWS, user_id='user'), image())
+        blog_id = orjson.loads(response.body)['blog_id']
+
+    assert await search(database, 'locacion') == ['Alquileres']
+
+    async with database.async_write_session() as session:
+        update = BlogUpdate(id=blog_id, title='Sucesiones', body='La declaratoria de herederos se tramita ante el juez. ' * 40, categories=CategoryBlog.NEWS, user_id='user')
+        await BlogService(session).update(update, None, 'user')
+
+    assert await search(database, 'locacion') == []
+    assert await search(database, 'herederos') == ['Sucesiones']
+
+    # Sin triggers, una conexion sin decompress_text puede escribir en blogs
+    with closing(sqlite3.connect(database.database_path)) as conn:
+        conn.execute("UPDATE blogs SET title = 'Sucesiones y herencias' WHERE id = ?", (blog_id,))
+        conn.commit()
+
+    async with database.async_write_session() as session:
+        await BlogService(session).delete(blog_id, 'user')
+
+    assert await search(database, 'herederos') == []
@@ -0,0 +1,13 @@
+from fastapi.responses import ORJSONResponse
+from src.services.cache_service import ResponseCache
+
+
+def test_response_read_before_clear_is_not_cached():
+    cache = ResponseCache('test', maxsize=8, ttl=60)
+    version = cache.version
+    cache.clear()
+    cache.set('key', version, ORJSONResponse({'id': 1}))
+    assert cache.get('key') is None
+
+    cache.set('key', cache.version, ORJSONResponse({'id': 1}))
+    assert cache.get('key').body == b'{"id":1}'
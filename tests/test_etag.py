@@ -0,0 +1,65 @@
+import io
+import os
+import httpx
+import orjson
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+from src.app import app
+from src.models.blog_model import CategoryBlog
+from src.models.user_model import User
+from src.schemas.blog_schemas.blog_create import BlogCreate
+from src.schemas.blog_schemas.blog_update import BlogUpdate
+from src.schemas.user_schema.user_update import UserUpdate
+from src.services.blog_service import BlogService
+from src.services.user_service import UserService
+
+pytestmark = pytest.mark.anyio
+
+IMAGE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'static', 'image', 'admin_user.png')
+
+
+def image() -> UploadFile:
+    with open(IMAGE_PATH, 'rb') as file:
+        return UploadFile(io.BytesIO(file.read()), filename='blog.png', headers=Headers({'content-type': 'image/png'}))
+
+async def test_blog_etag_follows_blog_and_author(database):
+    user = User(id='user', username='abogado', email='abogado@sijac.com', first_name='Nombre', last_name='Apellido', password_hash='-', specialty='Civil', url_image='user.png')
+    async with database.async_write_session() as session:
+        session.add(user)
+        await session.commit()
+        response = await BlogService(session).create(BlogCreate(title='Alquileres', body='Contrato de locacion.', categories=CategoryBlog.NEWS, user_id='user'), image())
+        blog_id = orjson.loads(response.body)['blog_id']
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://testserver') as client:
+        async def get(etag: str | None = None) -> httpx.Response:
+            headers = {'If-None-Match': etag} if etag else {}
+            return await client.get(f'/blog/get/{blog_id}', headers=headers)
+
+        first = await get()
+        assert first.status_code == 200
+        etag = first.headers['etag']
+
+        cached = await get(etag)
+        assert cached.status_code == 304
+        assert cached.content == b''
+        assert cached.headers['etag'] == etag
+
+        async with database.async_write_session() as session:
+            update = BlogUpdate(id=blog_id, title='Sucesiones', body='Declaratoria de herederos.', categories=CategoryBlog.NEWS, user_id='user')
+            await BlogService(session).update(update, None, 'user')
+
+        after_blog = await get(etag)
+        assert after_blog.status_code == 200
+        assert after_blog.json()['title'] == 'Sucesiones'
+        assert after_blog.headers['etag'] != etag
+        etag = after_blog.headers['etag']
+
+        # El blog incluye nombre y avatar del autor: editar el usuario cambia el ETag
+        async with database.async_write_session() as session:
+            await UserService(session).update_user(UserUpdate(username='abogado', first_name='Otro', last_name='Apellido', specialty='Civil'), user, None)
+
+        after_user = await get(etag)
+        assert after_user.status_code == 200
+        assert after_user.json()['user']['first_name'] == 'Otro'
+        assert after_user.headers['etag'] != etag
@@ -0,0 +1,65 @@
+import io
+import os
+import orjson
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+from src.models.blog_model import Blog, CategoryBlog
+from src.models.image_reference import ImageReference
+from src.models.user_model import User
+from src.schemas.blog_schemas.blog_create import BlogCreate
+from src.schemas.blog_schemas.blog_update import BlogUpdate
+from src.services.blog_service import BlogService
+
+pytestmark = pytest.mark.anyio
+
+IMAGE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'static', 'image', 'admin_user.png')
+BLOG_IMAGES = os.path.join('src', 'images', 'blog')
+
+
+def image() -> UploadFile:
+    with open(IMAGE_PATH, 'rb') as file:
+        return UploadFile(io.BytesIO(file.read()), filename='blog.png', headers=Headers({'content-type': 'image/png'}))
+
+async def create_blog(database, title: str) -> tuple[str, str]:
+    async with database.async_write_session() as session:
+        if await session.get(User, 'user') is None:
+            session.add(User(id='user', username='abogado', email='abogado@sijac.com', first_name='Nombre', last_name='Apellido', password_hash='-', specialty='Civil', url_image='user.png'))
+            await session.commit()
+        response = await BlogService(session).create(BlogCreate(title=title, body='Contrato de locacion.', categories=CategoryBlog.NEWS, user_id='user'), image())
+        blog_id = orjson.loads(response.body)['blog_id']
+    async with database.async_session() as session:
+        return blog_id, (await session.get(Blog, blog_id)).url_image
+
+async def refs(database, filename: str) -> int:
+    async with database.async_session() as session:
+        reference = await session.get(ImageReference, ('blog', filename))
+        return 0 if reference is None else reference.refs
+
+async def test_shared_image_survives_until_last_blog_is_deleted(database):
+    first_id, filename = await create_blog(database, 'Alquileres')
+    second_id, second_filename = await create_blog(database, 'Sucesiones')
+    # La misma imagen se guarda una sola vez y la comparten los dos blogs
+    assert second_filename == filename
+    assert await refs(database, filename) == 2
+
+    async with database.async_write_session() as session:
+        await BlogService(session).delete(first_id, 'user')
+    assert await refs(database, filename) == 1
+    assert os.path.exists(os.path.join(BLOG_IMAGES, filename))
+
+    async with database.async_write_session() as session:
+        await BlogService(session).delete(second_id, 'user')
+    assert await refs(database, filename) == 0
+    assert not os.path.exists(os.path.join(BLOG_IMAGES, filename))
+
+async def test_update_with_same_image_keeps_file(database):
+    blog_id, filename = await create_blog(database, 'Alquileres')
+
+    async with database.async_write_session() as session:
+        update = BlogUpdate(id=blog_id, title='Alquileres', body='Contrato de locacion.', categories=CategoryBlog.NEWS, user_id='user')
+        response = await BlogService(session).update(update, image(), 'user')
+    assert response.status_code == 200
+
+    assert await refs(database, filename) == 1
+    assert os.path.exists(os.path.join(BLOG_IMAGES, filename))
@@ -0,0 +1,81 @@
+import sqlite3
+from contextlib import closing
+from datetime import date, datetime
+import pytest
+from sqlalchemy import event
+from starlette.requests import Request
+from src.config.pagination import encode_cursor
+from src.config.scheduler_task import clean_orphan_images, purge_stale_rows
+from src.database.types import decompress_text
+from src.models.user_model import User
+from src.services.appointment_service import AppointmentService
+from src.services.audit_service import AuditService
+from src.services.availability_service import AvailabilityService
+from src.services.blog_service import BlogService
+from src.services.cache_service import blog_cache
+from src.services.case_service import CaseService
+from src.services.user_service import UserService
+
+pytestmark = pytest.mark.anyio
+
+REQUEST = Request({'type': 'http', 'scheme': 'http', 'method': 'GET', 'path': '/', 'query_string': b'', 'headers': [(b'host', b'testserver')]})
+CURSOR = encode_cursor(datetime.now(), 'id')
+TODAY = date.today()
+
+# Consultas frecuentes, ejecutadas desde el codigo real de los servicios
+SERVICE_CALLS = {
+    'AppointmentService.get_all': lambda s: AppointmentService(s).get_all('user', TODAY, TODAY),
+    'AvailabilityService.get_all': lambda s: AvailabilityService(s).get_all(REQUEST, 'user', TODAY, TODAY),
+    'AvailabilityService.get': lambda s: AvailabilityService(s).get(REQUEST, 'availability', 'user'),
+    'CaseService.get_all': lambda s: CaseService(s).get_all('user'),
+    'CaseService.get': lambda s: CaseService(s).get('case', 'user'),
+    'BlogService.get_all': lambda s: BlogService(s).get_all(REQUEST),
+    'BlogService.get_favorites': lambda s: BlogService(s).get_favorites(REQUEST),
+    'BlogService.get_all.cursor': lambda s: BlogService(s).get_all(REQUEST, after=CURSOR),
+    'BlogService.get': lambda s: BlogService(s).get(REQUEST, 'blog'),
+    'BlogService.search': lambda s: BlogService(s).search(REQUEST, 'derecho'),
+    'AuditService.get_all': lambda s: AuditService(s).get_all(),
+    'AuditService.get_all.cursor': lambda s: AuditService(s).get_all(after=CURSOR),
+    'UserService.refresh_token': lambda s: UserService(s).refresh_token(User(id='user'), 'token', 'refresh'),
+    'purge_stale_rows': lambda s: purge_stale_rows(),
+    'clean_orphan_images': lambda s: clean_orphan_images(),
+}
+
+
+def query_plan(database_path: str, statement: str, parameters) -> list[str]:
+    with closing(sqlite3.connect(database_path)) as conn:
+        conn.create_function('decompress_text', 1, decompress_text, deterministic=True)
+        return [row[-1] for row in conn.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+
+
+def is_table_scan(detail: str) -> bool:
+    # Las subconsultas, filas constantes y la tabla FTS no son recorridos de una tabla
+    if not detail.startswith('SCAN ') or detail.startswith(('SCAN (', 'SCAN CONSTANT ROW')):
+        return False
+    return 'USING INDEX' not in detail and 'USING COVERING INDEX' not in detail and 'VIRTUAL TABLE' not in detail
+
+
+@pytest.mark.parametrize('name', SERVICE_CALLS)
+async def test_service_queries_use_indexes(database, name):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'WITH')):
+            statements.append((statement, parameters))
+
+    engines = (database.engine.sync_engine, database.read_engine.sync_engine)
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        blog_cache.clear()
+        async with database.async_write_session() as session:
+            await SERVICE_CALLS[name](session)
+    finally:
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', capture)
+
+    assert statements, f'{name} no ejecuto consultas'
+    for statement, parameters in statements:
+        plan = query_plan(database.database_path, statement, parameters)
+        full_scans = [detail for detail in plan if is_table_scan(detail)]
+        assert not full_scans, f'{name} recorre tablas sin indice: {plan}\n{statement}'
@@ -0,0 +1,53 @@
+import asyncio
+import os
+import sqlite3
+import subprocess
+import sys
+from contextlib import closing
+from datetime import datetime
+import pytest
+from src.database.replica import Replicator
+from src.database.restore import restore
+from src.models.audit import Audit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def add_audits(database, count: int) -> None:
+    async with database.async_write_session() as session:
+        for _ in range(count):
+            session.add(Audit(user_id='user', method='test', old_data='', new_data=''))
+        await session.commit()
+
+def count_audits(path: str) -> int:
+    with closing(sqlite3.connect(path)) as conn:
+        return conn.execute('SELECT count(*) FROM audits').fetchone()[0]
+
+
+# checkpoint_bytes=0 hace un checkpoint en cada copia: los segmentos cruzan reinicios del WAL
+@pytest.mark.anyio
+@pytest.mark.parametrize('checkpoint_bytes', [0, 4194304])
+async def test_restore_at_timestamp(database, tmp_path, checkpoint_bytes):
+    replicator = Replicator(str(tmp_path / 'replica'), interval=1, snapshot_interval=3600, retention=86400, checkpoint_bytes=checkpoint_bytes)
+    (tmp_path / 'replica').mkdir()
+    await add_audits(database, 2)
+    await replicator.snapshot()
+
+    await add_audits(database, 3)
+    await replicator.sync()
+    await asyncio.sleep(0.01)
+    middle = datetime.now()
+    await asyncio.sleep(0.01)
+
+    await add_audits(database, 4)
+    await replicator.sync()
+    await add_audits(database, 1)
+    await replicator.sync()
+
+    assert count_audits(restore(str(tmp_path / 'replica'), str(tmp_path / 'middle.db'), middle)) == 5
+    assert count_audits(restore(str(tmp_path / 'replica'), str(tmp_path / 'latest.db'))) == 10
+
+def test_restore_cli_does_not_import_the_app():
+    code = 'import sys, src.database.restore; print("src.app" in sys.modules, "src.database.db" in sys.modules)'
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ['False', 'False']
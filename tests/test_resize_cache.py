@@ -0,0 +1,34 @@
+import os
+import pytest
+from src.services.image_service import ResizeCache
+
+
+def write(path, size, atime):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(b'x' * size)
+    os.utime(path, (atime, atime))
+
+
+@pytest.mark.anyio
+async def test_resize_cache_evicts_least_recently_used(tmp_path):
+    old, recent = str(tmp_path / 'blog' / 'a_w320.jpg'), str(tmp_path / 'blog' / 'b_w320.jpg')
+    write(old, 40, 1000)
+    write(recent, 40, 2000)
+    cache = ResizeCache(str(tmp_path), max_bytes=100)
+    await cache.load()
+    assert cache.stats() == {"files": 2, "size": 80, "max_size": 100}
+
+    # Al usar la mas vieja pasa a ser la mas reciente
+    await cache.touch(old)
+    new = str(tmp_path / 'blog' / 'c_w320.jpg')
+    write(new, 40, 3000)
+    await cache.add(new)
+
+    assert not os.path.exists(recent)
+    assert os.path.exists(old) and os.path.exists(new)
+    assert cache.stats()["size"] == 80
+
+    await cache.discard(str(tmp_path / 'blog' / 'a_w'))
+    assert not os.path.exists(old)
+    assert cache.stats() == {"files": 1, "size": 40, "max_size": 100}
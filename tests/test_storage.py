@@ -0,0 +1,36 @@
+import pytest
+from src.drive.storage import LocalStorage, StorageBackend
+
+
+def test_backend_must_implement_upload_and_download():
+    class UploadOnly(StorageBackend):
+        def list_names(self) -> set[str]:
+            return set()
+
+        def upload(self, path: str, name: str, mime_type: str) -> str:
+            return name
+
+    with pytest.raises(TypeError):
+        UploadOnly()
+
+def test_local_storage_round_trip(tmp_path):
+    source = tmp_path / 'backup.db.gz'
+    source.write_bytes(b'sijac' * 1000)
+    storage = LocalStorage(str(tmp_path / 'backups'))
+
+    storage.upload(str(source), 'sijac.db.gz', 'application/gzip')
+    assert storage.list_names() == {'sijac.db.gz'}
+
+    storage.download('sijac.db.gz', str(tmp_path / 'restored.db.gz'))
+    assert (tmp_path / 'restored.db.gz').read_bytes() == source.read_bytes()
+
+def test_local_storage_rejects_corrupted_backup(tmp_path):
+    source = tmp_path / 'backup.db.gz'
+    source.write_bytes(b'sijac')
+    storage = LocalStorage(str(tmp_path / 'backups'))
+    storage.upload(str(source), 'sijac.db.gz', 'application/gzip')
+    (tmp_path / 'backups' / 'sijac.db.gz').write_bytes(b'otro')
+
+    with pytest.raises(ValueError):
+        storage.download('sijac.db.gz', str(tmp_path / 'restored.db.gz'))
+    assert not (tmp_path / 'restored.db.gz').exists()
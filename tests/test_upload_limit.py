@@ -0,0 +1,69 @@
+import io
+import os
+import httpx
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+from src.app import app
+from src.middleware.upload_limit import MAX_BODY_SIZE
+from src.services.image_service import ImageTool
+
+pytestmark = pytest.mark.anyio
+
+IMAGE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'static', 'image', 'admin_user.png')
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def upload(data: bytes, size: int | None = None) -> tuple[UploadFile, io.BytesIO]:
+    file = io.BytesIO(data)
+    return UploadFile(file, size=size, filename='imagen.png', headers=Headers({'content-type': 'image/png'})), file
+
+async def test_read_image_accepts_png():
+    with open(IMAGE_PATH, 'rb') as file:
+        data = file.read()
+    image, _ = upload(data, len(data))
+    assert await ImageTool('imagenes').read_image(image) == (data, 'image/png')
+
+async def test_read_image_rejects_declared_size_without_reading():
+    image, file = upload(PNG_SIGNATURE, ImageTool.MAX_FILE_SIZE + 1)
+    assert await ImageTool('imagenes').read_image(image) is None
+    assert file.tell() == 0
+
+async def test_read_image_stops_reading_past_the_limit():
+    data = PNG_SIGNATURE + bytes(ImageTool.MAX_FILE_SIZE * 2)
+    image, file = upload(data)
+    assert await ImageTool('imagenes').read_image(image) is None
+    assert file.tell() <= ImageTool.MAX_FILE_SIZE + ImageTool.CHUNK_SIZE
+
+async def test_read_image_rejects_by_magic_bytes():
+    # El content-type dice PNG pero el contenido es un GIF
+    image, file = upload(b'GIF89a' + bytes(ImageTool.CHUNK_SIZE * 4))
+    assert await ImageTool('imagenes').read_image(image) is None
+    assert file.tell() == ImageTool.CHUNK_SIZE
+
+
+async def test_middleware_rejects_content_length_over_limit():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://testserver') as client:
+        files = {'image': ('imagen.png', PNG_SIGNATURE + bytes(MAX_BODY_SIZE), 'image/png')}
+        response = await client.post('/blog/create', files=files)
+    assert response.status_code == 413
+    assert response.json() == {"detail": "La solicitud excede el tamaño máximo permitido"}
+
+async def test_middleware_rejects_chunked_body_over_limit():
+    chunk_size = 64 * 1024
+    sent = 0
+
+    async def body():
+        nonlocal sent
+        yield b'--limite\r\nContent-Disposition: form-data; name="image"; filename="imagen.png"\r\nContent-Type: image/png\r\n\r\n'
+        for _ in range(2 * MAX_BODY_SIZE // chunk_size):
+            sent += chunk_size
+            yield bytes(chunk_size)
+        yield b'\r\n--limite--\r\n'
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://testserver') as client:
+        response = await client.post('/blog/create', content=body(), headers={'content-type': 'multipart/form-data; boundary=limite'})
+    # El HTTPException del middleware llega a FastAPI como cualquier otro
+    assert response.status_code == 413
+    assert response.json() == {"detail": "La solicitud excede el tamaño máximo permitido"}
+    assert sent <= MAX_BODY_SIZE + chunk_size
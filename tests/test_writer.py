@@ -0,0 +1,133 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from sqlmodel import select
+from src.database.writer import WriteQueue
+
+
+async def hold_turn(queue: WriteQueue, holding: asyncio.Event, release: asyncio.Event) -> None:
+    async with queue.turn():
+        holding.set()
+        await release.wait()
+
+async def assert_free(queue: WriteQueue) -> None:
+    # Si el turno quedo tomado esto vence en lugar de quedar colgado
+    async def take():
+        async with queue.turn():
+            pass
+    await asyncio.wait_for(asyncio.create_task(take()), 1)
+
+
+@pytest.mark.anyio
+async def test_turns_are_granted_in_arrival_order():
+    queue = WriteQueue(max_pending=8, timeout=5)
+    holding, release = asyncio.Event(), asyncio.Event()
+    holder = asyncio.create_task(hold_turn(queue, holding, release))
+    await holding.wait()
+
+    order = []
+    async def write(name):
+        async with queue.turn():
+            order.append(name)
+            await asyncio.sleep(0)
+
+    waiters = []
+    for name in ('b', 'c', 'd'):
+        waiters.append(asyncio.create_task(write(name)))
+        await asyncio.sleep(0)
+    assert queue.pending() == 3
+
+    release.set()
+    await asyncio.gather(holder, *waiters)
+    assert order == ['b', 'c', 'd']
+    await queue.stop()
+
+@pytest.mark.anyio
+async def test_full_queue_returns_503():
+    queue = WriteQueue(max_pending=1, timeout=5)
+    holding, release = asyncio.Event(), asyncio.Event()
+    holder = asyncio.create_task(hold_turn(queue, holding, release))
+    await holding.wait()
+    waiter = asyncio.create_task(hold_turn(queue, asyncio.Event(), asyncio.Event()))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as error:
+        async with queue.turn():
+            pass
+    assert error.value.status_code == 503
+
+    waiter.cancel()
+    release.set()
+    await holder
+    await queue.stop()
+
+@pytest.mark.anyio
+async def test_timed_out_waiter_returns_503_and_is_skipped():
+    queue = WriteQueue(max_pending=8, timeout=0.05)
+    holding, release = asyncio.Event(), asyncio.Event()
+    holder = asyncio.create_task(hold_turn(queue, holding, release))
+    await holding.wait()
+
+    with pytest.raises(HTTPException) as error:
+        async with queue.turn():
+            pass
+    assert error.value.status_code == 503
+
+    release.set()
+    await holder
+    # La tarea de la cola descarta al que vencio y sigue entregando turnos
+    await assert_free(queue)
+    assert not queue._task.done()
+    await queue.stop()
+
+@pytest.mark.anyio
+async def test_nested_turn_in_same_task_does_not_deadlock():
+    queue = WriteQueue(max_pending=8, timeout=5)
+
+    async def nested():
+        async with queue.turn():
+            async with queue.turn():
+                pass
+            # El turno interno no libera el externo
+            assert queue._owner.get() is asyncio.current_task()
+
+    await asyncio.wait_for(nested(), 1)
+    await assert_free(queue)
+    await queue.stop()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize('finish', ['commit', 'rollback', 'close'])
+async def test_write_session_releases_turn(database, finish):
+    session = database.async_write_session()
+    await session.exec(select(1))
+    assert session._turn is not None
+
+    await getattr(session, finish)()
+    assert session._turn is None
+    await assert_free(database.writer)
+    await session.close()
+
+@pytest.mark.anyio
+async def test_write_session_commit_without_changes(database):
+    # Sin operaciones previas el commit no pide el turno
+    async with database.async_write_session() as session:
+        await session.commit()
+        assert session._turn is None
+        await assert_free(database.writer)
+
+@pytest.mark.anyio
+async def test_write_session_turn_is_lazy(database):
+    async with database.async_write_session() as session:
+        holding, release = asyncio.Event(), asyncio.Event()
+        holder = asyncio.create_task(hold_turn(database.writer, holding, release))
+        await holding.wait()
+        # Crear la sesion no toma el turno; la primera consulta espera al que lo tiene
+        query = asyncio.create_task(session.exec(select(1)))
+        await asyncio.sleep(0.05)
+        assert not query.done()
+        release.set()
+        await holder
+        await query
+        await session.commit()
+    await assert_free(database.writer)